@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the scrapers
+
+Replays recorded responses of each comic site through the shared HTTP
+session, runs every scraper's check_for_updates against an in-memory
+MongoDB (mongomock) and a stubbed Telegram API, and reports wall time, CPU
+time, peak memory and request counts per scraper. Nothing touches the
+network or the real database, so parser, HTTP and database changes can be
+compared against a stable baseline.
+
+Usage:
+    python benchmark.py --record            # record fixtures from the live sites
+    python benchmark.py                     # replay all scrapers with fixtures
+    python benchmark.py PbfScraper -n 10    # replay one scraper ten times
+    python benchmark.py --json new.json --baseline old.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import tracemalloc
+from statistics import median
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from rsr import config
+
+# Fixtures are stored per scraper: benchmarks/<ScraperClass>/responses.json
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+
+TELEGRAM_PREFIX = 'https://api.telegram.org'
+
+# Canned Bot API answer, good enough for sendMessage/sendPhoto/sendMediaGroup
+TELEGRAM_RESULT = {'ok': True, 'result': {'message_id': 1, 'photo': [{'file_id': 'benchmark'}]}}
+
+def _build_response(request, status, headers, body):
+    """Build a requests.Response as an adapter would return it"""
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers)
+    response.url = request.url
+    response.request = request
+    response.reason = requests.status_codes._codes.get(status, ('',))[0].upper()
+    response._content = body
+    # Served from memory: iter_content() and close() must not touch raw
+    response._content_consumed = True
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+class TelegramStub(BaseAdapter):
+    """Answers every Bot API call with a success, without posting anything"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        body = json.dumps(TELEGRAM_RESULT).encode()
+        return _build_response(request, 200, {'Content-Type': 'application/json'}, body)
+
+    def close(self):
+        pass
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Serves recorded responses instead of going to the network
+
+    Requests without a recording get a 404 and are listed in 'missing', so a
+    scraper whose site changed shows up instead of silently hitting the web.
+    """
+
+    def __init__(self, fixture_dir):
+        super().__init__()
+        self.fixture_dir = fixture_dir
+        with open(os.path.join(fixture_dir, 'responses.json'), encoding='utf-8') as f:
+            entries = json.load(f)
+        self.responses = {}
+        for entry in entries:
+            with open(os.path.join(fixture_dir, entry['body']), 'rb') as f:
+                body = f.read()
+            self.responses[(entry['method'], entry['url'])] = (entry['status'], entry['headers'], body)
+        self.calls = 0
+        self.missing = []
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        recorded = self.responses.get((request.method, request.url))
+        if recorded is None:
+            self.missing.append(request.url)
+            return _build_response(request, 404, {}, b'')
+        status, headers, body = recorded
+        return _build_response(request, status, headers, body)
+
+    def close(self):
+        pass
+
+class RecordingAdapter(HTTPAdapter):
+    """Fetches from the network and keeps every response for the fixtures"""
+
+    def __init__(self):
+        super().__init__()
+        self.recorded = []
+        self.calls = 0
+        self.missing = []
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = super().send(request, **kwargs)
+        # Reading the body here keeps it available to the caller as well
+        self.recorded.append((request.method, request.url, response.status_code,
+                              dict(response.headers), response.content))
+        return response
+
+    def save(self, fixture_dir):
+        """
+        Write the recorded responses to a fixture directory
+
+        Args:
+            fixture_dir (str): Directory for this scraper's fixtures
+        """
+        os.makedirs(fixture_dir, exist_ok=True)
+        entries = []
+        for method, url, status, headers, body in self.recorded:
+            extension = os.path.splitext(urlparse(url).path)[1][:5] or '.html'
+            name = hashlib.sha1(f"{method} {url}".encode()).hexdigest()[:16] + extension
+            with open(os.path.join(fixture_dir, name), 'wb') as f:
+                f.write(body)
+            # The body is stored decoded, so drop the headers describing the transfer
+            headers = {k: v for k, v in headers.items()
+                       if k.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')}
+            entries.append({'method': method, 'url': url, 'status': status, 'headers': headers, 'body': name})
+        with open(os.path.join(fixture_dir, 'responses.json'), 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+
+def prepare_environment():
+    """
+    Point the bot at throwaway state and an in-memory database
+
+    Returns:
+        bool: False when mongomock is not installed
+    """
+    try:
+        import mongomock
+    except ImportError:
+        print("mongomock is required for benchmarks: pip install mongomock")
+        return False
+
+    import rsr.utils.db as db
+    db.MongoClient = mongomock.MongoClient
+    db.close_clients()
+
+    # Keep validators and other state out of the real state directory, send
+    # all traffic through the adapters mounted below (the disk cache would
+    # hide them after the first run, aiohttp would bypass them) and remove
+    # the Telegram rate limits, which would only measure sleeping
+    reset_state()
+    config.http_host_pool_sizes = {}
+    config.http_cache_max_bytes = 0
+    config.async_aiohttp = False
+    config.telegram_global_rate = 1e6
+    config.telegram_channel_rate = 1e6
+    config.telegram_private_rate = 1e6
+    config.telegram_chat_burst = 1e6
+    return True
+
+def mount(adapter):
+    """
+    Route all traffic of a fresh shared session through an adapter
+
+    Args:
+        adapter: Adapter for the comic sites
+
+    Returns:
+        TelegramStub: The adapter answering Bot API calls
+    """
+    from rsr.utils.session import get_session, reset_session
+    reset_session()
+    session = get_session()
+    telegram = TelegramStub()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.mount(TELEGRAM_PREFIX, telegram)
+    return telegram
+
+def reset_state():
+    """
+    Give the next run a fresh, empty state directory
+    
+    Without this, later runs would take other request paths than the first
+    one (304s from saved validators, learned probe winners, known file_ids,
+    cached normalized images) and the median would mix both.
+    """
+    from rsr.utils import http, telegram, tumblr
+    if getattr(config, 'state_dir', None) and os.path.basename(config.state_dir).startswith('rsr-benchmark-'):
+        shutil.rmtree(config.state_dir, ignore_errors=True)
+    config.state_dir = tempfile.mkdtemp(prefix='rsr-benchmark-')
+    config.metrics_log_path = os.path.join(config.state_dir, 'run_metrics.jsonl')
+    
+    # State loaded by the previous run is also kept in memory
+    http._validators.reload()
+    http._probe_winners.reload()
+    tumblr._resolved.reload()
+    telegram._file_ids = None
+
+def reset_database():
+    """Drop everything the previous run stored"""
+    from rsr.utils.db import get_client
+    get_client().drop_database(config.mongodb_db)
+
+def run_once(scraper_class, adapter):
+    """
+    Run a scraper once against the mounted adapters
+
+    Args:
+        scraper_class: The scraper class to run
+        adapter: Adapter for the comic sites (replay or recording)
+
+    Returns:
+        dict: Wall/CPU time, peak memory, request counts and stage timings
+    """
+    from rsr.main import _execute
+    reset_state()
+    reset_database()
+    telegram = mount(adapter)
+    adapter.calls = 0
+
+    tracemalloc.reset_peak()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = _execute(scraper_class)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    peak = tracemalloc.get_traced_memory()[1] - memory_before
+
+    return {
+        'status': result['status'],
+        'posted': result['posted'],
+        'wall': wall,
+        'cpu': cpu,
+        'peak_memory': peak,
+        'requests': adapter.calls,
+        'telegram_calls': telegram.calls,
+        'stages': result.get('stages', {})
+    }
+
+def benchmark(scraper_class, fixtures_dir, repeat):
+    """
+    Replay a scraper several times
+
+    Args:
+        scraper_class: The scraper class to benchmark
+        fixtures_dir (str): Root directory of the fixtures
+        repeat (int): Number of runs
+
+    Returns:
+        dict or None: Aggregated measurements, or None without fixtures
+    """
+    fixture_dir = os.path.join(fixtures_dir, scraper_class.__name__)
+    if not os.path.exists(os.path.join(fixture_dir, 'responses.json')):
+        return None
+
+    adapter = ReplayAdapter(fixture_dir)
+    runs = [run_once(scraper_class, adapter) for _ in range(repeat)]
+    last = runs[-1]
+    return {
+        'status': last['status'],
+        'posted': last['posted'],
+        'wall': median(r['wall'] for r in runs),
+        'cpu': median(r['cpu'] for r in runs),
+        'peak_memory': max(r['peak_memory'] for r in runs),
+        'requests': last['requests'],
+        'telegram_calls': last['telegram_calls'],
+        'missing': sorted(set(adapter.missing)),
+        'stages': last['stages']
+    }
+
+def record(scraper_class, fixtures_dir):
+    """
+    Run a scraper against the live site and save its responses
+
+    Telegram is still stubbed, so nothing is posted.
+
+    Args:
+        scraper_class: The scraper class to record
+        fixtures_dir (str): Root directory of the fixtures
+    """
+    adapter = RecordingAdapter()
+    run = run_once(scraper_class, adapter)
+    adapter.save(os.path.join(fixtures_dir, scraper_class.__name__))
+    print(f"{scraper_class.__name__}: recorded {len(adapter.recorded)} response(s) ({run['status']})")
+
+def print_results(results, baseline=None):
+    """
+    Print a results table, with the change against a baseline if given
+
+    Args:
+        results (dict): Scraper name -> measurements
+        baseline (dict, optional): Earlier results to compare with
+    """
+    print(f"{'Scraper':<28}{'wall ms':>10}{'cpu ms':>10}{'peak KB':>10}{'reqs':>6}{'tg':>5}  status")
+    for name, r in results.items():
+        line = (f"{name:<28}{r['wall'] * 1000:>10.1f}{r['cpu'] * 1000:>10.1f}"
+                f"{r['peak_memory'] / 1024:>10.0f}{r['requests']:>6}{r['telegram_calls']:>5}  {r['status']}")
+        if baseline and name in baseline and baseline[name]['wall']:
+            change = (r['wall'] - baseline[name]['wall']) / baseline[name]['wall'] * 100
+            line += f"  ({change:+.0f}% wall)"
+        print(line)
+        if r['missing']:
+            print(f"    {len(r['missing'])} request(s) without a recording, e.g. {r['missing'][0]}")
+
+def main():
+    """Parse the arguments and run or record the benchmarks"""
+    parser = argparse.ArgumentParser(description='Benchmark the scrapers against recorded responses')
+    parser.add_argument('scrapers', nargs='*', help='Scraper class names (default: all active scrapers)')
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='Runs per scraper (default: 5)')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIR, help='Fixtures directory')
+    parser.add_argument('--record', action='store_true', help='Record fixtures from the live sites')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--baseline', help='Compare with results written by --json')
+    args = parser.parse_args()
+
+    if not prepare_environment():
+        return 1
+
+    from rsr.scrapers import load_scrapers
+    try:
+        scraper_classes = load_scrapers(args.scrapers)
+    except KeyError as e:
+        print(e.args[0])
+        return 1
+
+    tracemalloc.start()
+
+    if args.record:
+        for scraper_class in scraper_classes:
+            record(scraper_class, args.fixtures)
+        return 0
+
+    results = {}
+    for scraper_class in scraper_classes:
+        result = benchmark(scraper_class, args.fixtures, max(1, args.repeat))
+        if result is None:
+            print(f"{scraper_class.__name__}: no fixtures, run with --record first")
+            continue
+        results[scraper_class.__name__] = result
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
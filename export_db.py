@@ -5,12 +5,12 @@ Export MongoDB collections to JSON files for easy transfer to another system
 import os
 import json
 from datetime import datetime
-from pymongo import MongoClient
 from bson import json_util
 
-# Connect to MongoDB
-client = MongoClient('localhost', 27017)
-db = client['comics_db']  # Use the correct database name from base.py
+from rsr.utils.db import get_db_connection
+
+# Connect to MongoDB (shared client)
+db = get_db_connection()
 
 # Create export directory if it doesn't exist
 export_dir = 'db_export'
@@ -25,21 +25,15 @@ try:
     if '.' not in sys.path:
         sys.path.insert(0, '.')
         
-    from rsr.scrapers import active_scrapers
-    for scraper_class in active_scrapers:
-        try:
-            scraper_instance = scraper_class()
-            # Get the collection name - note that BaseScraper doesn't directly expose 
-            # the collection name as an attribute, we need to get it from the posted attribute
-            collections.append(scraper_instance.posted.name)
-        except Exception as e:
-            print(f"Error initializing {scraper_class.__name__}: {str(e)}")
+    # The registry knows every scraper's collection without importing it
+    from rsr.scrapers import registry
+    collections = [entry.collection for entry in registry.values()]
 except ImportError as e:
     print(f"Warning: Could not import scrapers module: {str(e)}")
     # Fallback: list of known comic collections
     collections = [
         'xkcd', 'theoatmeal', 'pbf', 'warandpeas', 'sarahsscribbles',
-        'explosm', 'efc', 'loadingartist', 'Optipess', 'piecomic',
+        'explosm', 'efc', 'la', 'Optipess', 'piecomic',
         'poorlydrawnlines', 'NerfNow', 'theodd1sout', 'skeletonclaw',
         'somethingpositive', 'safelyendangered', 'falseknees'
     ]
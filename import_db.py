@@ -6,9 +6,10 @@ import os
 import json
 import argparse
 from datetime import datetime
-from pymongo import MongoClient
 from bson import json_util
 
+from rsr.utils.db import get_client
+
 def main():
     parser = argparse.ArgumentParser(description='Import MongoDB collections from exported JSON files')
     parser.add_argument('--host', default='localhost', help='MongoDB host (default: localhost)')
@@ -20,7 +21,7 @@ def main():
     args = parser.parse_args()
 
     # Connect to MongoDB
-    client = MongoClient(args.host, args.port)
+    client = get_client(args.host, args.port)
     db = client[args.db]
 
     # Verify export directory exists
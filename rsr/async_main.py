@@ -0,0 +1,182 @@
+"""
+Asyncio runner for the RSS Slave Bot
+
+Runs the selected scrapers on one event loop. Scrapers written as
+coroutines (rsr.scrapers.async_base.AsyncScraper) run as tasks, up to
+async_concurrency at once, so many feeds can be waited on without a thread
+each. Other scrapers run unchanged on a bounded thread pool, as in
+rsr.main.
+"""
+import time
+import asyncio
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from rsr.main import _execute, DEFAULT_WORKERS, DEFAULT_TIMEOUT
+from rsr.scrapers.async_base import AsyncScraper
+from rsr.utils import aio, metrics
+from rsr.utils.settings import get_setting
+from rsr.config import adminchat
+
+# Used when the async_concurrency / async_offload_workers settings are not configured
+DEFAULT_CONCURRENCY = 100
+DEFAULT_OFFLOAD_WORKERS = 32
+
+async def _execute_async(scraper_class):
+    """
+    Run a coroutine scraper and describe the outcome
+
+    Args:
+        scraper_class: An AsyncScraper subclass
+
+    Returns:
+        dict: Result in the same format as rsr.main._execute
+    """
+    scraper_name = scraper_class.__name__
+    start = time.monotonic()
+
+    result = {'scraper': scraper_name, 'status': 'ok', 'posted': 0, 'duration': 0.0}
+    with metrics.collect(scraper_name) as report:
+        scraper = None
+        try:
+            scraper = scraper_class()
+            result['posted'] = await scraper.check_for_updates_async() or 0
+            await scraper.finish_async()
+        except asyncio.CancelledError:
+            # Timed out; comics posted so far still have to be recorded.
+            # Shielded so the flush completes in its thread even though this
+            # task is being cancelled, without blocking the loop
+            if scraper is not None:
+                try:
+                    await asyncio.shield(aio.offload(scraper.finish, True))
+                except Exception as e:
+                    print(f"{scraper_name} error while finishing: {str(e)}")
+            raise
+        except Exception as e:
+            error_msg = f"{scraper_name} error: {str(e)}"
+            print(error_msg)
+            await aio.send_message(adminchat, error_msg)
+            result['status'] = 'error'
+            result['error'] = str(e)
+
+            if scraper is not None:
+                try:
+                    await scraper.finish_async(failed=True)
+                except Exception as e:
+                    print(f"{scraper_name} error while finishing: {str(e)}")
+
+    result['duration'] = round(time.monotonic() - start, 3)
+    result['stages'] = report.to_dict()
+    return result
+
+async def _run_one(scraper_class, executor, semaphore, timeout):
+    """
+    Run one scraper with the concurrency limit and timeout applied
+
+    Args:
+        scraper_class: The scraper class to run
+        executor (ThreadPoolExecutor): Pool for scrapers that are not coroutines
+        semaphore (asyncio.Semaphore): Limit on coroutine scrapers running at once
+        timeout (float): Wall-clock limit in seconds, 0 or None for none
+
+    Returns:
+        dict: Result in the same format as rsr.main._execute
+    """
+    scraper_name = getattr(scraper_class, "__name__", "Unknown scraper")
+    if isinstance(scraper_class, type) and issubclass(scraper_class, AsyncScraper):
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                return await asyncio.wait_for(_execute_async(scraper_class), timeout or None)
+            except asyncio.TimeoutError:
+                pass
+    else:
+        # Existing scrapers run unchanged in a thread. As in rsr.main, the
+        # timeout counts from when the thread picks the scraper up, and a
+        # scraper that times out keeps running in the background
+        started = {}
+        future = asyncio.get_running_loop().run_in_executor(executor, _execute, scraper_class, started)
+        poll = min(1.0, timeout) if timeout else None
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=poll)
+            if done:
+                return future.result()
+            start = started.get(scraper_class)
+            if start is not None and time.monotonic() - start > timeout:
+                break
+
+    error_msg = f"{scraper_name} timed out after {timeout}s"
+    print(error_msg)
+    await aio.send_message(adminchat, error_msg)
+    return {
+        'scraper': scraper_name,
+        'status': 'timeout',
+        'posted': 0,
+        'duration': round(time.monotonic() - start, 3)
+    }
+
+async def run_scrapers_async(scraper_classes, workers=None, timeout=None, concurrency=None):
+    """
+    Run several scrapers on the event loop and collect a run summary
+
+    Args:
+        scraper_classes (list): Scraper classes to run
+        workers (int, optional): Threads for scrapers that are not coroutines
+        timeout (float, optional): Wall-clock limit in seconds per scraper
+        concurrency (int, optional): Coroutine scrapers running at once
+
+    Returns:
+        dict: Run summary in the same format as rsr.main.run_scrapers
+    """
+    if workers is None:
+        workers = get_setting('scraper_workers', DEFAULT_WORKERS)
+    if timeout is None:
+        timeout = get_setting('scraper_timeout', DEFAULT_TIMEOUT)
+    if concurrency is None:
+        concurrency = get_setting('async_concurrency', DEFAULT_CONCURRENCY)
+    workers = max(1, int(workers))
+
+    run_start = time.monotonic()
+    started_at = datetime.now()
+
+    # Database and Telegram calls of coroutine scrapers run on the loop's
+    # default executor; give it room for many scrapers at once
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(
+        max_workers=get_setting('async_offload_workers', DEFAULT_OFFLOAD_WORKERS),
+        thread_name_prefix="offload"
+    ))
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scraper")
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    try:
+        ordered = await asyncio.gather(*[
+            _run_one(cls, executor, semaphore, timeout) for cls in scraper_classes
+        ])
+    finally:
+        executor.shutdown(wait=False)
+
+    return {
+        'started': started_at.isoformat(),
+        'duration': round(time.monotonic() - run_start, 3),
+        'workers': workers,
+        'posted': sum(r['posted'] for r in ordered),
+        'failed': [r['scraper'] for r in ordered if r['status'] != 'ok'],
+        'results': ordered
+    }
+
+def run_scrapers(scraper_classes, workers=None, timeout=None):
+    """
+    Run several scrapers in a new event loop
+
+    Drop-in replacement for rsr.main.run_scrapers.
+
+    Args:
+        scraper_classes (list): Scraper classes to run
+        workers (int, optional): Threads for scrapers that are not coroutines
+        timeout (float, optional): Wall-clock limit in seconds per scraper
+
+    Returns:
+        dict: Run summary with totals and one result per scraper
+    """
+    return aio.run(run_scrapers_async(scraper_classes, workers, timeout))
@@ -0,0 +1,40 @@
+"""
+Configuration settings for the RSS Slave Bot
+
+Copy this file to config.py and fill in your own values
+"""
+
+# Telegram bot API key - Get this from @BotFather
+botapi = 'YOUR_BOT_API_TOKEN'
+
+# Admin chat ID for notifications - Your personal chat ID for error messages
+adminchat = 'YOUR_ADMIN_CHAT_ID'
+
+# Default channel for comics - Channel where comics will be posted
+comics_channel = '@YOUR_CHANNEL_NAME'
+
+# Reddit user agent - Only needed if using Reddit-based scrapers
+reddit_user = "YOUR_REDDIT_USERNAME"
+
+# MongoDB configuration
+mongodb_host = 'localhost'
+mongodb_port = 27017
+mongodb_db = 'comics_db'
+backfill_limit = 10
+posted_buffer_size = 50
+posted_buffer_delay = 30
+http_cache_dir = None
+http_cache_max_bytes = 50 * 1024 * 1024
+http_cache_ttls = {}
+fingerprint_prefix_bytes = 64 * 1024
+
+image_max_width = 2560
+image_slice_aspect = 20
+image_workers = 2
+image_cache_entries = 200
+
+async_concurrency = 100
+async_offload_workers = 32
+async_http_connections = 100
+async_aiohttp = True
+file_id_cache_size = 5000
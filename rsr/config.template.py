@@ -19,4 +19,136 @@ reddit_user = "YOUR_REDDIT_USERNAME"
 # MongoDB configuration
 mongodb_host = 'localhost'
 mongodb_port = 27017
-mongodb_db = 'comics_db' 
\ No newline at end of file
+mongodb_db = 'comics_db' 
+# Connection pool of the single MongoDB client shared by all scrapers
+mongodb_max_pool_size = 50
+mongodb_min_pool_size = 0
+# Scraper execution - Number of scrapers run at the same time, and the
+# wall-clock limit (in seconds) for a single scraper before it is reported
+# as timed out
+scraper_workers = 8
+scraper_timeout = 300
+
+# HTTP connection pooling - All requests share one keep-alive session.
+# http_pool_maxsize is the number of connections kept per host, and
+# http_host_pool_sizes overrides it for busy hosts (URL prefix -> size)
+http_pool_connections = 32
+http_pool_maxsize = 8
+http_host_pool_sizes = {'https://api.telegram.org': 16}
+http_connect_timeout = 5
+http_read_timeout = 30
+
+# Bot state - Directory for small state files such as HTTP cache validators
+# (defaults to the 'state' folder in the project root)
+# state_dir = '/var/lib/rssslavebot'
+
+# Posted-comic index - Identifiers are loaded into memory once per run.
+# Collections with more documents than the threshold use a bloom filter
+# (with the given false positive rate) to keep memory bounded
+posted_index_bloom_threshold = 100000
+posted_index_error_rate = 0.001
+
+# Telegram rate limits - Outbound calls are queued per chat (in order) and
+# throttled with token buckets. Rates are messages per second; groups and
+# channels allow about 20 per minute, private chats about 1 per second
+telegram_global_rate = 25
+telegram_channel_rate = 20 / 60
+telegram_private_rate = 1.0
+telegram_chat_burst = 3
+telegram_max_retries = 5
+
+# Albums - Number of album items checked (HEAD) or downloaded at the same time
+album_workers = 8
+
+# URL probing - Number of candidate URLs checked (HEAD) at the same time
+# when a scraper has to guess where an image lives
+probe_workers = 12
+
+# Daemon mode (python run.py --daemon) - Seconds between polls of each
+# comic, with +/- poll_jitter (fraction) randomisation. scraper_intervals
+# overrides the interval per scraper class, e.g. {'ExplosmScraper': 600}
+poll_interval = 900
+poll_jitter = 0.1
+scraper_intervals = {}
+
+# Adaptive polling (daemon mode) - Intervals are learned from each comic's
+# posting history: the typical gap between updates divided by
+# adaptive_polls_per_update, shorter during usual posting hours and when an
+# update is overdue, and kept within the min/max bounds (seconds)
+adaptive_polling = True
+adaptive_min_interval = 300
+adaptive_max_interval = 6 * 3600
+adaptive_polls_per_update = 48
+
+# Run metrics - Per-stage timings (http, parse, db, telegram, image_download)
+# of every scraper run are appended as JSON lines to metrics_log_path
+# (default: state/run_metrics.jsonl). Set metrics_admin_report to also send
+# a short report of the slowest scrapers to the admin chat after each run
+metrics_log_path = None
+metrics_admin_report = False
+
+# HTML parser used by makesoup ("lxml", or "html.parser" if lxml is not
+# installed). Scrapers can also limit parsing to the elements they need
+# by declaring a parse_scope (a bs4 SoupStrainer)
+html_parser = "lxml"
+
+# Catch-up - Scrapers that list several comics (archive pages, feeds) post
+# every comic missed since the last run, oldest first, up to backfill_limit
+# per run. A comic with no posts yet only gets its newest comic
+backfill_limit = 10
+
+# Posted records - Records of posted comics are written in batches: after
+# posted_buffer_size records, when one has waited posted_buffer_delay
+# seconds, and at the end of each scraper run
+posted_buffer_size = 50
+posted_buffer_delay = 30
+
+# HTTP cache - Pages that scrapers fetch with cached_request (e.g. comic
+# permalinks) are kept on disk in http_cache_dir (default: state/http_cache),
+# up to http_cache_max_bytes, least recently used first out. Entries expire
+# per the page's Cache-Control headers or the scraper's cache_ttl;
+# http_cache_ttls overrides the TTL per scraper class, e.g. {'PbfScraper': 86400}
+http_cache_dir = None
+http_cache_max_bytes = 50 * 1024 * 1024
+http_cache_ttls = {}
+
+# Image fingerprints - Scrapers with fingerprint_images (PDL, Optipess,
+# Loading Artist) skip images already posted under another URL. The first
+# fingerprint_prefix_bytes of an image are hashed; with Pillow installed,
+# images up to fingerprint_perceptual_max_bytes also get a perceptual hash,
+# matching copies within fingerprint_perceptual_distance bits (of 64)
+fingerprint_prefix_bytes = 64 * 1024
+fingerprint_perceptual_max_bytes = 2 * 1024 * 1024
+fingerprint_perceptual_distance = 6
+
+# Image uploads - When Telegram cannot fetch an image, the bot downloads and
+# uploads it itself, up to image_max_bytes. Images over Telegram's 10 MB
+# photo limit and animated GIFs are sent as documents
+image_max_bytes = 50 * 1024 * 1024
+
+# Telegram file_ids of sent images are kept in state/telegram_file_ids.json,
+# so an image sent again (in a later run or to another channel) is not
+# uploaded twice; the file_id_cache_size most recently used are kept
+file_id_cache_size = 5000
+
+# Image normalization - Needs Pillow. Scrapers with normalize_images
+# (False Knees, The Oatmeal, Safely Endangered), and any upload over the 10 MB
+# photo limit, are converted to JPEG, downscaled to image_max_width and, if
+# taller or wider than image_slice_aspect times their other side, sliced into
+# album panels. Without Pillow images are posted by URL as they are.
+# The work runs in image_workers processes; results are cached in
+# state/normalized_images, keeping the last image_cache_entries images
+image_max_width = 2560
+image_slice_aspect = 20
+image_workers = 2
+image_cache_entries = 200
+
+# Asyncio runner (python run.py --async) - Scrapers written as coroutines run
+# as tasks, at most async_concurrency at once; their MongoDB and Telegram calls
+# use async_offload_workers threads. Pages are fetched with aiohttp when it is
+# installed (at most async_http_connections connections) unless async_aiohttp
+# is False; otherwise through the shared requests session in threads
+async_concurrency = 100
+async_offload_workers = 32
+async_http_connections = 100
+async_aiohttp = True
@@ -0,0 +1,249 @@
+"""
+Long-running scheduler for the RSS Slave Bot
+
+Keeps one process alive so the imported scrapers, the shared HTTP session
+and the MongoDB client stay warm between polls, and runs every scraper on
+its own interval instead of one cron-driven pass over all of them.
+
+Signals:
+    SIGTERM / SIGINT: finish the scrapers that are running, then exit
+    SIGHUP: reload rsr/config.py and recompute the polling intervals
+"""
+import time
+import random
+import signal
+import importlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from rsr import config
+from rsr.main import _execute, prepare_indexes, select_scrapers, DEFAULT_WORKERS, DEFAULT_TIMEOUT
+from rsr.scrapers import registry
+from rsr.utils import metrics
+from rsr.utils.cadence import (
+    load_post_times, estimate_cadence, adaptive_interval,
+    DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL, DEFAULT_POLLS_PER_UPDATE, DEFAULT_HISTORY_SIZE
+)
+from rsr.utils.db import get_collection
+from rsr.utils.session import reset_session
+from rsr.utils.settings import get_setting
+from rsr.utils.telegram import send_message
+from rsr.config import botapi, adminchat
+
+# Defaults used when the poll_* settings are not configured
+DEFAULT_POLL_INTERVAL = 900
+DEFAULT_POLL_JITTER = 0.1
+
+def _notify(message, params=""):
+    """Send an admin message without letting a Telegram failure stop the daemon"""
+    try:
+        send_message(botapi, adminchat, message, params)
+    except Exception as e:
+        print(f"Could not notify admin chat: {str(e)}")
+
+class Scheduler:
+    """
+    Runs each scraper repeatedly on its own interval
+    
+    A scraper is never run twice at the same time: its next run is
+    scheduled when the current one finishes.
+    """
+    
+    def __init__(self, scraper_classes, workers=None):
+        """
+        Initialize the scheduler
+        
+        Args:
+            scraper_classes (list): Scraper classes to schedule
+            workers (int, optional): Maximum number of scrapers running at once
+        """
+        self.scraper_classes = list(scraper_classes)
+        self.workers = workers
+        self.stop_event = threading.Event()
+        self.reload_requested = False
+        # Set by reload(); the HTTP session is only rebuilt once no scraper
+        # is using it, and no scraper is started until then
+        self.session_reset_pending = False
+        self.next_run = {}
+        self.running = {}
+        self.started = {}
+        self.reported_timeouts = set()
+        self.collections = {}
+        # Posted indexes per scraper, kept between polls so that each poll
+        # does not read the whole collection again; add_to_posted keeps
+        # them in sync with what the scraper posts
+        self.posted_indexes = {}
+    
+    def interval_for(self, scraper_class):
+        """
+        Get the polling interval of a scraper
+        
+        Args:
+            scraper_class: The scraper class
+        
+        An explicit entry in scraper_intervals always wins. Otherwise, with
+        adaptive_polling enabled, the interval is derived from the comic's
+        posting history, falling back to poll_interval for comics without
+        enough history.
+        
+        Returns:
+            float: Seconds between the end of one run and the start of the next
+        """
+        intervals = get_setting('scraper_intervals', {})
+        if scraper_class.__name__ in intervals:
+            return intervals[scraper_class.__name__]
+        
+        default = get_setting('poll_interval', DEFAULT_POLL_INTERVAL)
+        if not get_setting('adaptive_polling', True):
+            return default
+        
+        try:
+            times = load_post_times(self._collection_for(scraper_class), DEFAULT_HISTORY_SIZE)
+            cadence = estimate_cadence(times)
+        except Exception as e:
+            print(f"Could not estimate cadence of {scraper_class.__name__}: {str(e)}")
+            return default
+        if cadence is None:
+            return default
+        
+        return adaptive_interval(
+            cadence,
+            min_interval=get_setting('adaptive_min_interval', DEFAULT_MIN_INTERVAL),
+            max_interval=get_setting('adaptive_max_interval', DEFAULT_MAX_INTERVAL),
+            polls_per_update=get_setting('adaptive_polls_per_update', DEFAULT_POLLS_PER_UPDATE)
+        )
+    
+    def _collection_for(self, scraper_class):
+        # Registered scrapers are looked up, others only know their
+        # collection once instantiated
+        collection = self.collections.get(scraper_class)
+        if collection is None:
+            entry = registry.get(scraper_class.__name__)
+            collection = get_collection(entry.collection) if entry else scraper_class().posted
+            self.collections[scraper_class] = collection
+        return collection
+    
+    def _jittered(self, interval):
+        # Spread runs out so scrapers scheduled together drift apart
+        jitter = get_setting('poll_jitter', DEFAULT_POLL_JITTER)
+        return max(0, interval * (1 + random.uniform(-jitter, jitter)))
+    
+    def _schedule(self, scraper_class, now):
+        self.next_run[scraper_class] = now + self._jittered(self.interval_for(scraper_class))
+    
+    def request_stop(self, signum=None, frame=None):
+        """Stop after the running scrapers have finished"""
+        print("Stop requested, waiting for running scrapers...")
+        self.stop_event.set()
+    
+    def request_reload(self, signum=None, frame=None):
+        """Reload the configuration before the next scheduling step"""
+        self.reload_requested = True
+    
+    def reload(self):
+        """
+        Reload rsr/config.py and reschedule every scraper
+        
+        Settings read on every run or poll take effect immediately: polling
+        intervals, scraper_timeout, backfill and buffer settings. The HTTP
+        session (http_* timeouts and pool sizes) is rebuilt once the
+        scrapers running now have finished.
+        
+        Everything else is built once and needs a restart: values imported
+        at startup (bot token, channels), scraper_workers, the Telegram
+        dispatcher (telegram_* rates and retries), the MongoDB clients
+        (mongodb_* settings), the image worker pool (image_workers), the
+        HTTP cache (http_cache_*) and the file_id store size.
+        """
+        self.reload_requested = False
+        importlib.reload(config)
+        self.session_reset_pending = True
+        # Pick up changes made to the collections from outside (e.g. import_db)
+        self.posted_indexes = {}
+        now = time.monotonic()
+        for scraper_class in self.scraper_classes:
+            if scraper_class not in self.running:
+                self._schedule(scraper_class, now)
+        print("Configuration reloaded")
+        _notify("Configuration reloaded")
+    
+    def _collect(self, now):
+        # Reschedule finished scrapers and report ones that run too long
+        timeout = get_setting('scraper_timeout', DEFAULT_TIMEOUT)
+        for scraper_class, future in list(self.running.items()):
+            if future.done():
+                del self.running[scraper_class]
+                self.reported_timeouts.discard(scraper_class)
+                result = future.result()
+                metrics.write_lines([dict(result, type='scraper', run=datetime.now().isoformat())])
+                self._schedule(scraper_class, now)
+            elif timeout and scraper_class not in self.reported_timeouts:
+                start = self.started.get(scraper_class)
+                if start is not None and now - start > timeout:
+                    self.reported_timeouts.add(scraper_class)
+                    _notify(f"{scraper_class.__name__} has been running for over {timeout}s")
+    
+    def run(self):
+        """
+        Run the scheduler until SIGTERM/SIGINT
+        
+        Must be called from the main thread so that signals can be handled.
+        """
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self.request_reload)
+        
+        workers = self.workers or get_setting('scraper_workers', DEFAULT_WORKERS)
+        executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="scraper")
+        
+        # First runs are spread over a short window instead of all at once
+        now = time.monotonic()
+        for scraper_class in self.scraper_classes:
+            self.next_run[scraper_class] = now + random.uniform(0, 10)
+        
+        _notify(f"*{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} Daemon started*", "parse_mode=Markdown")
+        try:
+            while not self.stop_event.is_set():
+                if self.reload_requested:
+                    self.reload()
+                
+                now = time.monotonic()
+                self._collect(now)
+                
+                if self.session_reset_pending and not self.running:
+                    reset_session()
+                    self.session_reset_pending = False
+                
+                for scraper_class in self.scraper_classes:
+                    if self.session_reset_pending:
+                        break
+                    if scraper_class not in self.running and self.next_run[scraper_class] <= now:
+                        indexes = self.posted_indexes.setdefault(scraper_class, {})
+                        self.running[scraper_class] = executor.submit(_execute, scraper_class, self.started, indexes)
+                
+                # Wake up for the next scheduled run, and check on running
+                # scrapers often enough to reschedule them promptly
+                waiting = [self.next_run[c] for c in self.scraper_classes if c not in self.running]
+                sleep_for = min(waiting) - now if waiting else 1.0
+                if self.running:
+                    sleep_for = min(sleep_for, 0.25)
+                self.stop_event.wait(min(max(sleep_for, 0.05), 1.0))
+        finally:
+            executor.shutdown(wait=True)
+            _notify("*Daemon stopped*", "parse_mode=Markdown")
+
+def main(names=None):
+    """
+    Run the active scrapers in daemon mode
+    
+    Args:
+        names (list, optional): Only run these scrapers
+    """
+    entries = select_scrapers(names)
+    prepare_indexes(entries)
+    Scheduler([entry.load() for entry in entries]).run()
+
+if __name__ == "__main__":
+    main()
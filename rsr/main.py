@@ -1,47 +1,247 @@
 """
 Main entry point for the RSS Slave Bot
 
-This script runs all the active scrapers in sequence
+This script runs all the active scrapers concurrently on a bounded thread pool
 """
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-from rsr.scrapers import active_scrapers
+from rsr.scrapers import registry, get_entry
+from rsr.utils import metrics
+from rsr.utils.db import ensure_indexes, get_collection
 from rsr.utils.telegram import send_message
+from rsr.utils.settings import get_setting
 from rsr.config import botapi, adminchat
 
+# Defaults used when scraper_workers / scraper_timeout are not configured
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 300
+
+def _execute(scraper_class, started=None, posted_indexes=None):
+    """
+    Run a single scraper and describe the outcome
+
+    Args:
+        scraper_class: The scraper class to instantiate and run
+        started (dict, optional): Shared dict where the start time is recorded
+        posted_indexes (dict, optional): Posted indexes of an earlier run of
+            the same scraper (see BaseScraper.get_posted_index), reused
+            instead of reading the collection again. Loaded indexes are
+            added to it; it is emptied when the run reports an error, so
+            the next run reloads from the database
+
+    Returns:
+        dict: Result with 'scraper', 'status', 'posted', 'duration' and
+            'stages' (per-stage timings, see rsr.utils.metrics) keys
+    """
+    scraper_name = getattr(scraper_class, "__name__", "Unknown scraper")
+    start = time.monotonic()
+    if started is not None:
+        started[scraper_class] = start
+
+    result = {'scraper': scraper_name, 'status': 'ok', 'posted': 0, 'duration': 0.0}
+    with metrics.collect(scraper_name) as report:
+        scraper = None
+        try:
+            scraper = scraper_class()
+            if posted_indexes is not None:
+                scraper.use_posted_indexes(posted_indexes)
+            result['posted'] = scraper.check_for_updates() or 0
+            scraper.finish()
+            if posted_indexes is not None and scraper.error_count:
+                # A record may have failed to store
+                posted_indexes.clear()
+        except Exception as e:
+            error_msg = f"{scraper_name} error: {str(e)}"
+            print(error_msg)
+            send_message(botapi, adminchat, error_msg)
+            result['status'] = 'error'
+            result['error'] = str(e)
+            if posted_indexes is not None:
+                posted_indexes.clear()
+            
+            # Comics posted before the error still have to be recorded
+            if scraper is not None:
+                try:
+                    scraper.finish(failed=True)
+                except Exception as e:
+                    print(f"{scraper_name} error while finishing: {str(e)}")
+
+    result['duration'] = round(time.monotonic() - start, 3)
+    result['stages'] = report.to_dict()
+    return result
+
+def select_scrapers(names=None):
+    """
+    Look up the scrapers to run in the registry
+
+    Args:
+        names (list, optional): Scraper names (see rsr.scrapers.get_entry);
+            all registered scrapers when empty
+
+    Returns:
+        list: Registry entries of the selected scrapers
+
+    Raises:
+        KeyError: If a name does not match any scraper
+    """
+    if not names:
+        return list(registry.values())
+    return [get_entry(name) for name in names]
+
+def prepare_indexes(entries):
+    """
+    Make sure every scraper's collection has its lookup indexes
+
+    Run once at startup; creating an index that already exists is a no-op.
+    Only the registry metadata is used, no scraper module is imported.
+
+    Args:
+        entries (list): Registry entries whose collections to index
+    """
+    for entry in entries:
+        try:
+            for warning in ensure_indexes(get_collection(entry.collection), entry.id_field):
+                print(f"{entry.name}: {warning}")
+                send_message(botapi, adminchat, f"{entry.name}: {warning}")
+        except Exception as e:
+            error_msg = f"{entry.name} error while creating indexes: {str(e)}"
+            print(error_msg)
+            send_message(botapi, adminchat, error_msg)
+
 def run_scraper(scraper_class):
     """
     Run a scraper with proper error handling
-    
+
     Args:
         scraper_class: The scraper class to instantiate and run
-        
+
     Returns:
         int: Number of comics posted
     """
-    try:
-        scraper = scraper_class()
-        return scraper.check_for_updates()
-    except Exception as e:
-        scraper_name = getattr(scraper_class, "__name__", "Unknown scraper")
-        error_msg = f"{scraper_name} error: {str(e)}"
-        print(error_msg)
-        send_message(botapi, adminchat, error_msg)
-        return 0
-
-def main():
-    """Main function to run all scrapers"""
+    return _execute(scraper_class)['posted']
+
+def run_scrapers(scraper_classes, workers=None, timeout=None):
+    """
+    Run several scrapers at once and collect a run summary
+
+    A scraper that exceeds the timeout is reported and its result is
+    discarded. Python threads cannot be killed, so the scraper keeps running
+    in the background until its own requests give up.
+
+    Args:
+        scraper_classes (list): Scraper classes to run
+        workers (int, optional): Maximum number of scrapers running at once
+        timeout (float, optional): Wall-clock limit in seconds per scraper
+
+    Returns:
+        dict: Run summary with totals and one result per scraper
+    """
+    if workers is None:
+        workers = get_setting('scraper_workers', DEFAULT_WORKERS)
+    if timeout is None:
+        timeout = get_setting('scraper_timeout', DEFAULT_TIMEOUT)
+    workers = max(1, int(workers))
+
+    run_start = time.monotonic()
+    started_at = datetime.now()
+    started = {}
+    results = {}
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scraper")
+    futures = {executor.submit(_execute, cls, started): cls for cls in scraper_classes}
+    pending = set(futures)
+    poll = min(1.0, timeout) if timeout else None
+
+    while pending:
+        done, pending = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[futures[future]] = future.result()
+
+        if not timeout:
+            continue
+
+        # Give up on scrapers that have been running for too long
+        now = time.monotonic()
+        for future in list(pending):
+            scraper_class = futures[future]
+            start = started.get(scraper_class)
+            if start is not None and now - start > timeout:
+                pending.discard(future)
+                scraper_name = getattr(scraper_class, "__name__", "Unknown scraper")
+                error_msg = f"{scraper_name} timed out after {timeout}s"
+                print(error_msg)
+                send_message(botapi, adminchat, error_msg)
+                results[scraper_class] = {
+                    'scraper': scraper_name,
+                    'status': 'timeout',
+                    'posted': 0,
+                    'duration': round(now - start, 3)
+                }
+
+    executor.shutdown(wait=False)
+
+    ordered = [results[cls] for cls in scraper_classes]
+    return {
+        'started': started_at.isoformat(),
+        'duration': round(time.monotonic() - run_start, 3),
+        'workers': workers,
+        'posted': sum(r['posted'] for r in ordered),
+        'failed': [r['scraper'] for r in ordered if r['status'] != 'ok'],
+        'results': ordered
+    }
+
+def format_summary(summary):
+    """
+    Format a run summary for the admin chat
+
+    Args:
+        summary (dict): Summary returned by run_scrapers
+
+    Returns:
+        str: Markdown message
+    """
+    message = f"*Done!* Posted {summary['posted']} comic(s) in {summary['duration']:.1f}s"
+    for result in summary['results']:
+        if result['status'] != 'ok':
+            message += f"\n{result['scraper']}: {result['status']}"
+    return message
+
+def main(names=None, use_async=False):
+    """
+    Main function to run all scrapers
+
+    Args:
+        names (list, optional): Only run these scrapers
+        use_async (bool): Run on an event loop (see rsr.async_main), so
+            scrapers written as coroutines do not need a thread each
+    """
+    entries = select_scrapers(names)
+
     # Log start time
     now = datetime.now()
     message = f"{now.strftime('%Y-%m-%d %H:%M:%S')} Checking for updates..."
     send_message(botapi, adminchat, f"*{message}*", "parse_mode=Markdown")
+
+    # Keep duplicate checks on indexed fields
+    prepare_indexes(entries)
     
-    # Run all active scrapers
-    for scraper_class in active_scrapers:
-        run_scraper(scraper_class)
-    
+    # Run the selected scrapers (only their modules are imported)
+    if use_async:
+        from rsr.async_main import run_scrapers as run_async
+        summary = run_async([entry.load() for entry in entries])
+    else:
+        summary = run_scrapers([entry.load() for entry in entries])
+
     # Log completion
-    send_message(botapi, adminchat, "*Done!*", "parse_mode=Markdown")
+    send_message(botapi, adminchat, format_summary(summary), "parse_mode=Markdown")
+    
+    # Record per-stage timings
+    metrics.write_run_report(summary)
+    if get_setting('metrics_admin_report', False):
+        send_message(botapi, adminchat, metrics.format_report(summary))
+    return summary
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
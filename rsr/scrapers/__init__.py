@@ -3,46 +3,127 @@ Webcomic scrapers for the RSS Slave Bot
 
 This package contains all the individual scrapers for different webcomics.
 Each scraper is responsible for fetching and posting updates from a specific webcomic.
+
+Scrapers are listed in a registry with the metadata tools need (collection,
+identifier field, channel). A scraper module is only imported when its class
+is actually needed, so importing this package stays cheap.
 """
+import importlib
+
+from rsr.utils.settings import get_setting
+
+class ScraperEntry:
+    """
+    Registry metadata of one scraper
+
+    The collection and id_field must match what the scraper class uses.
+    load() checks the id_field and BaseScraper checks the collection, so a
+    mismatch stops the scraper instead of indexing the wrong collection or
+    field (see rsr.main.prepare_indexes).
+    """
+
+    def __init__(self, class_name, module, collection, id_field='comic_id', channel='comics_channel'):
+        """
+        Args:
+            class_name (str): Name of the scraper class
+            module (str): Module name inside rsr.scrapers
+            collection (str): MongoDB collection of posted comics
+            id_field (str): Field identifying a comic in the collection
+            channel (str): Name of the config setting holding the channel ID
+        """
+        self.name = class_name
+        self.module = module
+        self.collection = collection
+        self.id_field = id_field
+        self.channel_setting = channel
+
+    @property
+    def channel(self):
+        """str: Telegram channel the scraper posts to"""
+        return get_setting(self.channel_setting)
+
+    def load(self):
+        """
+        Import the scraper module and get its class
+
+        Returns:
+            type: The scraper class
+        
+        Raises:
+            ValueError: If the class uses another id_field than the entry
+        """
+        module = importlib.import_module(f"{__name__}.{self.module}")
+        scraper_class = getattr(module, self.name)
+        if scraper_class.id_field != self.id_field:
+            raise ValueError(f"{self.name} uses id_field '{scraper_class.id_field}', "
+                             f"but its registry entry says '{self.id_field}'")
+        return scraper_class
+
+    def __repr__(self):
+        return f"ScraperEntry({self.name!r}, {self.module!r}, {self.collection!r})"
 
-# Import all scrapers for registration
+# All active scrapers, in the order they are run
 # As new scrapers are implemented, add them here
-from rsr.scrapers.xkcd import XkcdScraper
-from rsr.scrapers.oatmeal import OatmealScraper
-from rsr.scrapers.pbf import PbfScraper
-from rsr.scrapers.warandpeas import WarAndPeasScraper
-from rsr.scrapers.sarahsscribbles import SarahsScribblesScraper
-from rsr.scrapers.explosm import ExplosmScraper
-from rsr.scrapers.efc import EfcScraper
-from rsr.scrapers.loadingartist import LoadingArtistScraper
-from rsr.scrapers.optipess import OptipessScraper
-from rsr.scrapers.piecomic import PieComicScraper
-from rsr.scrapers.pdl import PoorlyDrawnLinesScraper
-from rsr.scrapers.nerfnow import NerfNowScraper
-from rsr.scrapers.theodd1sout import TheOdd1sOutScraper
-from rsr.scrapers.skeletonclaw import SkeletonClawScraper
-from rsr.scrapers.somethingpositive import SomethingPositiveScraper
-from rsr.scrapers.safelyendangered import SafelyEndangeredScraper
-from rsr.scrapers.falseknees import FalseKneesScraper
-
-# List of active scrapers to run
-active_scrapers = [
-    XkcdScraper,
-    OatmealScraper,
-    PbfScraper,
-    WarAndPeasScraper,
-    SarahsScribblesScraper,
-    ExplosmScraper,
-    EfcScraper,
-    LoadingArtistScraper,
-    OptipessScraper,
-    PieComicScraper,
-    PoorlyDrawnLinesScraper,
-    NerfNowScraper,
-    TheOdd1sOutScraper,
-    SkeletonClawScraper,
-    SomethingPositiveScraper,
-    SafelyEndangeredScraper,
-    FalseKneesScraper,
+registry = {entry.name: entry for entry in [
+    ScraperEntry('XkcdScraper', 'xkcd', 'xkcd'),
+    ScraperEntry('OatmealScraper', 'oatmeal', 'theoatmeal'),
+    ScraperEntry('PbfScraper', 'pbf', 'pbf', 'url'),
+    ScraperEntry('WarAndPeasScraper', 'warandpeas', 'warandpeas', 'url'),
+    ScraperEntry('SarahsScribblesScraper', 'sarahsscribbles', 'sarahsscribbles'),
+    ScraperEntry('ExplosmScraper', 'explosm', 'explosm', 'url'),
+    ScraperEntry('EfcScraper', 'efc', 'efc', 'url'),
+    ScraperEntry('LoadingArtistScraper', 'loadingartist', 'la', 'url'),
+    ScraperEntry('OptipessScraper', 'optipess', 'Optipess', 'url'),
+    ScraperEntry('PieComicScraper', 'piecomic', 'piecomic', 'post_id'),
+    ScraperEntry('PoorlyDrawnLinesScraper', 'pdl', 'poorlydrawnlines', 'url'),
+    ScraperEntry('NerfNowScraper', 'nerfnow', 'NerfNow', 'url'),
+    ScraperEntry('TheOdd1sOutScraper', 'theodd1sout', 'theodd1sout'),
+    ScraperEntry('SkeletonClawScraper', 'skeletonclaw', 'skeletonclaw'),
+    ScraperEntry('SomethingPositiveScraper', 'somethingpositive', 'somethingpositive'),
+    ScraperEntry('SafelyEndangeredScraper', 'safelyendangered', 'safelyendangered'),
+    ScraperEntry('FalseKneesScraper', 'falseknees', 'falseknees'),
     # Add more scrapers here as they're implemented
-] 
\ No newline at end of file
+]}
+
+def get_entry(name):
+    """
+    Find a scraper in the registry
+
+    Args:
+        name (str): Class name (e.g. 'XkcdScraper'), module name ('xkcd')
+            or collection name ('theoatmeal'), case-insensitive
+
+    Returns:
+        ScraperEntry: The matching entry
+
+    Raises:
+        KeyError: If no scraper has that name
+    """
+    wanted = name.lower()
+    for entry in registry.values():
+        if wanted in (entry.name.lower(), entry.module.lower(), entry.collection.lower()):
+            return entry
+    raise KeyError(f"Unknown scraper '{name}' (available: {', '.join(registry)})")
+
+def load_scrapers(names=None):
+    """
+    Import scraper classes
+
+    Args:
+        names (list, optional): Scraper names (see get_entry); all
+            registered scrapers when empty
+
+    Returns:
+        list: The scraper classes, in registry order when names is empty
+    """
+    entries = [get_entry(name) for name in names] if names else registry.values()
+    return [entry.load() for entry in entries]
+
+def __getattr__(name):
+    # Keep "from rsr.scrapers import active_scrapers" and direct class
+    # imports working; both import the scraper modules on first use
+    if name == 'active_scrapers':
+        return load_scrapers()
+    if name in registry:
+        return registry[name].load()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,159 @@
+"""
+Base class for scrapers written as coroutines
+"""
+from rsr.scrapers.base import BaseScraper
+from rsr.utils import aio
+from rsr.utils.settings import get_setting
+
+class AsyncScraper(BaseScraper):
+    """
+    Scraper whose check runs as a coroutine
+
+    Subclasses implement `check_for_updates_async` instead of
+    `check_for_updates` and use the awaitable helpers below. Pages are
+    fetched without blocking the event loop (see rsr.utils.aio); database
+    and Telegram work runs in worker threads. The asyncio runner
+    (rsr.async_main) runs many such scrapers on one loop; the thread runner
+    and `__main__` blocks still work through `check_for_updates`, which
+    runs the coroutine in its own loop.
+
+    The helpers share the scraper's state (posted indexes, write buffer),
+    so a scraper should await its posts one at a time rather than gather
+    them.
+    """
+
+    def check_for_updates(self):
+        """
+        Run check_for_updates_async in a new event loop
+
+        Returns:
+            int: Number of new comics posted
+        """
+        return aio.run(self.check_for_updates_async())
+
+    async def check_for_updates_async(self):
+        """
+        Check for and post updates
+
+        Must be implemented by each specific scraper.
+
+        Returns:
+            int: Number of new comics posted
+        """
+        raise NotImplementedError("Subclasses must implement check_for_updates_async")
+
+    async def request_async(self, url):
+        """
+        Request a page
+
+        Args:
+            url (str): URL to request
+
+        Returns:
+            dict: Result of rsr.utils.aio.handle_request
+        """
+        return await aio.handle_request(url)
+
+    async def conditional_request_async(self, url):
+        """
+        Request a page with If-None-Match/If-Modified-Since
+
+        See BaseScraper.conditional_request.
+
+        Args:
+            url (str): URL to request
+
+        Returns:
+            dict: Result of rsr.utils.aio.handle_request
+        """
+        request = await aio.handle_request(url, conditional=True)
+        if not request['timeout'] and not request['not_modified'] and request['request'].ok:
+            self._pending_validators.append((url, request['request']))
+        return request
+
+    async def cached_request_async(self, url):
+        """
+        Request a page through the on-disk HTTP cache
+
+        See BaseScraper.cached_request.
+
+        Args:
+            url (str): URL to request
+
+        Returns:
+            dict: Result of rsr.utils.aio.handle_request
+        """
+        ttls = get_setting('http_cache_ttls', {}) or {}
+        ttl = ttls.get(type(self).__name__, self.cache_ttl)
+        return await aio.handle_request(url, cache=True, cache_ttl=ttl)
+
+    async def is_already_posted_async(self, identifier, id_field=None):
+        """
+        Check if a comic already exists in the database
+
+        Only the first check per field loads the index from the database
+        (in a worker thread); later checks are answered from memory.
+
+        Args:
+            identifier: The unique identifier for the comic
+            id_field (str, optional): The field name to check
+
+        Returns:
+            bool: True if already posted, False otherwise
+        """
+        if (id_field or self.id_field) in self._posted_indexes:
+            return self.is_already_posted(identifier, id_field)
+        return await aio.offload(self.is_already_posted, identifier, id_field)
+
+    async def add_to_posted_async(self, comic_data):
+        """
+        Add a comic to the database (see BaseScraper.add_to_posted)
+
+        Args:
+            comic_data (dict): Data to store in the database
+        """
+        await aio.offload(self.add_to_posted, comic_data)
+
+    async def post_comic_async(self, image_url, caption="", is_album=False):
+        """
+        Post a comic to Telegram (see BaseScraper.post_comic)
+
+        The message goes through the rate-limited Telegram dispatcher in a
+        worker thread.
+
+        Args:
+            image_url (str or list): URL of the image or list of URLs for albums
+            caption (str): Caption to include with the image
+            is_album (bool): Whether this is a multi-image comic (album)
+
+        Returns:
+            The result from the Telegram API
+        """
+        return await aio.offload(self.post_comic, image_url, caption, is_album)
+
+    async def log_success_async(self, count):
+        """
+        Log successful posting of comics (see BaseScraper.log_success)
+
+        Args:
+            count (int): Number of comics posted
+        """
+        await aio.offload(self.log_success, count)
+
+    async def log_error_async(self, message):
+        """
+        Log an error to the admin chat (see BaseScraper.log_error)
+
+        Args:
+            message (str): Error message
+        """
+        await aio.offload(self.log_error, message)
+
+    async def finish_async(self, failed=False):
+        """
+        Complete a run (see BaseScraper.finish)
+
+        Args:
+            failed (bool): True if check_for_updates_async raised
+        """
+        await aio.offload(self.finish, failed)
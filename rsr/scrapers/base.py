@@ -3,10 +3,31 @@ Base scraper class that serves as a foundation for all webcomic scrapers
 """
 from datetime import datetime
 
-from pymongo import MongoClient
+from rsr.utils import metrics, fingerprints
+from rsr.utils.db import get_db_connection
 from rsr.utils.telegram import sendPhoto, sendAlbums, send_message
+from rsr.utils.http import handleRequest, save_validators
+from rsr.utils.posted_index import PostedIndex, DEFAULT_BLOOM_THRESHOLD, DEFAULT_ERROR_RATE
+from rsr.utils.write_buffer import WriteBuffer, DEFAULT_BUFFER_SIZE, DEFAULT_BUFFER_DELAY
+from rsr.utils.settings import get_setting
+from rsr.scrapers import registry
 from rsr.config import botapi, adminchat
 
+# Used when the backfill_limit setting is not configured
+DEFAULT_BACKFILL_LIMIT = 10
+
+# Returned by post_comic when the image was already posted under another URL
+DUPLICATE = 'duplicate'
+
+class UnpostableComic(Exception):
+    """
+    Raised by post_candidate for a comic that can never be posted
+    
+    For example a text-only post or a page without a comic image. catch_up
+    records the comic as handled and carries on with the newer ones,
+    instead of retrying it (and stopping at it) on every run.
+    """
+
 class BaseScraper:
     """
     Base class for all webcomic scrapers
@@ -20,6 +41,29 @@ class BaseScraper:
     the `check_for_updates` method.
     """
     
+    # SoupStrainer limiting which elements of the main page are parsed
+    # (passed to makesoup); None parses the whole page
+    parse_scope = None
+    
+    # Seconds pages fetched with cached_request are kept in the on-disk
+    # HTTP cache; None follows the response's Cache-Control headers. The
+    # http_cache_ttls setting overrides it per scraper class name
+    cache_ttl = None
+    
+    # Skip images whose content was already posted under another URL
+    # (see rsr.utils.fingerprints); for scrapers that identify comics by
+    # image URL on hosts that vary query strings or size suffixes
+    fingerprint_images = False
+    
+    # Upload single images through rsr.utils.imaging (WebP to JPEG,
+    # downscaling, tall strips sliced into an album) instead of letting
+    # Telegram fetch the URL; needs Pillow, otherwise images go as they are
+    normalize_images = False
+    
+    # Field of the posted documents that identifies a comic (indexed as
+    # unique at startup, see rsr.utils.db.ensure_indexes)
+    id_field = 'comic_id'
+    
     def __init__(self, db_collection, channel_id):
         """
         Initialize the scraper with database collection and channel ID
@@ -27,14 +71,36 @@ class BaseScraper:
         Args:
             db_collection (str): MongoDB collection name for this comic
             channel_id (str): Telegram channel ID to post comics to
+        
+        Raises:
+            ValueError: If the registry lists the scraper with another collection
         """
-        client = MongoClient()
-        db = client.comics_db
+        entry = registry.get(type(self).__name__)
+        if entry is not None and entry.collection != db_collection:
+            raise ValueError(f"{type(self).__name__} uses collection '{db_collection}', "
+                             f"but its registry entry says '{entry.collection}'")
+        
+        db = get_db_connection()
         
         self.posted = db[db_collection]
         self.channel_id = channel_id
         self.comic_name = db_collection.capitalize()  # Default name based on collection
         
+        # Errors reported during this run and responses whose cache
+        # validators should be saved once the run completes cleanly
+        self.error_count = 0
+        self._pending_validators = []
+        
+        # Posted identifiers per field, loaded on first use
+        self._posted_indexes = {}
+        
+        # Posted records not written to the database yet
+        self._posted_buffer = WriteBuffer(
+            self.posted,
+            get_setting('posted_buffer_size', DEFAULT_BUFFER_SIZE),
+            get_setting('posted_buffer_delay', DEFAULT_BUFFER_DELAY)
+        )
+        
     def check_for_updates(self):
         """
         Main method to check for and post updates
@@ -43,35 +109,295 @@ class BaseScraper:
         Returns the number of new comics posted.
         """
         raise NotImplementedError("Subclasses must implement check_for_updates")
+    
+    def get_candidates(self):
+        """
+        List the comics currently shown by the site, for catch_up
+        
+        Only listing pages (archive, feed, front page) should be fetched
+        here. Detail pages are fetched by post_candidate, and only for
+        comics that have not been posted yet.
+        
+        Returns:
+            list: Candidate dicts, newest first, each with an 'id' key
+                holding the value stored under id_field
+        """
+        raise NotImplementedError("Scrapers using catch_up must implement get_candidates")
+    
+    def post_candidate(self, candidate):
+        """
+        Post a new comic found by get_candidates and add it to the database
+        
+        Return False for failures that may go away (request timeouts,
+        Telegram errors): catch_up stops there and retries the comic next
+        run. Raise UnpostableComic for comics that will never work.
+        
+        Args:
+            candidate (dict): One of the candidates returned by get_candidates
+        
+        Returns:
+            bool: True if the comic was posted
         
-    def is_already_posted(self, identifier, id_field='comic_id'):
+        Raises:
+            UnpostableComic: If the comic cannot be posted at all
+        """
+        raise NotImplementedError("Scrapers using catch_up must implement post_candidate")
+    
+    def unposted(self, candidates):
+        """
+        Get the candidates published since the newest posted one
+        
+        All candidates are checked with one bulk lookup. Older comics that
+        were never posted (e.g. from before the bot tracked this site) are
+        left alone.
+        
+        Args:
+            candidates (list): Candidate dicts with an 'id' key, newest first
+        
+        Returns:
+            list: The new candidates, newest first (each listed once)
+        """
+        with metrics.stage('db'):
+            missing = self.get_posted_index(self.id_field).missing([c['id'] for c in candidates])
+        
+        new = []
+        seen = set()
+        for candidate in candidates:
+            if candidate['id'] not in missing:
+                break
+            if candidate['id'] not in seen:
+                seen.add(candidate['id'])
+                new.append(candidate)
+        return new
+    
+    def catch_up(self):
+        """
+        Post every listed comic that was missed, oldest first
+        
+        Comics published between two runs (or while the bot was down) are
+        all posted instead of only the newest one. At most backfill_limit
+        comics are posted per run, the newest ones. A scraper with an empty
+        collection only posts the newest comic instead of the whole archive.
+        
+        Returns:
+            int: Number of comics posted
+        """
+        numberposted = 0
+        candidates = self.get_candidates()
+        if not candidates:
+            return numberposted
+        
+        new = self.unposted(candidates)
+        if not new:
+            return numberposted
+        
+        with metrics.stage('db'):
+            first_run = self.posted.estimated_document_count() == 0
+        limit = 1 if first_run else get_setting('backfill_limit', DEFAULT_BACKFILL_LIMIT)
+        if limit and len(new) > limit:
+            if not first_run:
+                print(f"{self.comic_name}: {len(new)} new comics, posting the newest {limit}")
+            new = new[:limit]
+        
+        for candidate in reversed(new):
+            try:
+                posted = self.post_candidate(candidate)
+            except UnpostableComic as e:
+                self.skip_candidate(candidate, str(e))
+                continue
+            except Exception as e:
+                self.log_error(f"Error processing comic: {str(e)}")
+                break
+            if not posted:
+                # Newer comics would be posted out of order, retry next run.
+                # Logged as an error so finish() keeps the validators and the
+                # next run does not get a 304
+                self.log_error(f"Could not post {candidate['id']}, retrying next run")
+                break
+            numberposted += 1
+        
+        self.log_success(numberposted)
+        return numberposted
+    
+    def skip_candidate(self, candidate, reason):
+        """
+        Record a comic that cannot be posted so it is not tried again
+        
+        The record marks the comic as handled (with a 'skipped' reason), so
+        unposted() treats it like a posted one. The admin chat is told once.
+        
+        Args:
+            candidate (dict): Candidate from get_candidates
+            reason (str): Why the comic cannot be posted
+        """
+        message = f"{self.comic_name}: skipping {candidate['id']}, {reason}"
+        print(message)
+        send_message(botapi, adminchat, message)
+        self.add_to_posted({self.id_field: candidate['id'], 'skipped': reason, 'date': datetime.now()})
+    
+    def sent(self, result):
+        """
+        Check whether post_comic delivered the comic to Telegram
+        
+        Args:
+            result: Return value of post_comic
+        
+        Returns:
+            bool: True if Telegram accepted the message (False for DUPLICATE)
+        """
+        return result is not None and getattr(result, 'ok', False)
+        
+    def conditional_request(self, url, stream=False):
+        """
+        Request a page with If-None-Match/If-Modified-Since
+        
+        Use this for index pages and feeds that are polled every run. When
+        the server answers 304 the returned dict has 'not_modified' set and
+        the scraper can return without parsing anything. The validators of
+        a fresh response are only saved by finish() if the run reported no
+        errors, so a failed run sees the page again next time.
+        
+        Args:
+            url (str): URL to request
+            stream (bool): Leave the body unread, for iterfeed
+            
+        Returns:
+            dict: Result of handleRequest
+        """
+        request = handleRequest(url, conditional=True, stream=stream)
+        if not request['timeout'] and not request['not_modified'] and request['request'].ok:
+            self._pending_validators.append((url, request['request']))
+        return request
+        
+    def cached_request(self, url):
+        """
+        Request a page through the on-disk HTTP cache
+        
+        Use this for pages that do not change once published, such as a
+        comic's permalink, so that a later run reads them from disk.
+        
+        Args:
+            url (str): URL to request
+        
+        Returns:
+            dict: Result of handleRequest
+        """
+        ttls = get_setting('http_cache_ttls', {}) or {}
+        ttl = ttls.get(type(self).__name__, self.cache_ttl)
+        return handleRequest(url, cache=True, cache_ttl=ttl)
+    
+    def finish(self, failed=False):
+        """
+        Complete a run after check_for_updates has returned
+        
+        Called by the runner; writes the buffered posted records and saves
+        the cache validators collected by conditional_request unless an
+        error was logged during the run.
+        
+        Args:
+            failed (bool): True if check_for_updates raised; the records
+                are still written but no validators are saved
+        """
+        self.flush_posted()
+        if self.error_count == 0 and not failed:
+            for url, response in self._pending_validators:
+                save_validators(url, response)
+        self._pending_validators = []
+        
+    def is_already_posted(self, identifier, id_field=None):
         """
         Check if a comic already exists in the database
         
         Args:
             identifier: The unique identifier for the comic
-            id_field (str): The field name to check in the database
+            id_field (str, optional): The field name to check in the
+                database (defaults to the scraper's id_field)
             
         Returns:
             bool: True if already posted, False otherwise
         """
-        return bool(self.posted.find_one({id_field: identifier}))
+        if id_field is None:
+            id_field = self.id_field
+        with metrics.stage('db'):
+            return identifier in self.get_posted_index(id_field)
+    
+    def get_posted_index(self, id_field):
+        """
+        Get the in-memory index of posted identifiers for a field
+        
+        The identifiers are loaded from the database once per scraper
+        instance (i.e. once per run, unless the runner hands over the
+        indexes of an earlier run with use_posted_indexes) and kept in sync
+        by add_to_posted.
+        
+        Args:
+            id_field (str): The field name holding the identifier
+        
+        Returns:
+            PostedIndex: The index for this collection and field
+        """
+        index = self._posted_indexes.get(id_field)
+        if index is None:
+            index = PostedIndex(
+                self.posted,
+                id_field,
+                get_setting('posted_index_bloom_threshold', DEFAULT_BLOOM_THRESHOLD),
+                get_setting('posted_index_error_rate', DEFAULT_ERROR_RATE)
+            )
+            # Records still in the buffer are not in the collection yet
+            for document in self._posted_buffer.pending:
+                if id_field in document:
+                    index.add(document[id_field])
+            self._posted_indexes[id_field] = index
+        return index
+    
+    def use_posted_indexes(self, indexes):
+        """
+        Share the posted indexes with other runs of this scraper
+        
+        The daemon keeps one dict per scraper between polls, so only the
+        first poll loads the identifiers from the database.
+        
+        Args:
+            indexes (dict): Field name -> PostedIndex, filled as indexes
+                are loaded
+        """
+        self._posted_indexes = indexes
         
     def add_to_posted(self, comic_data):
         """
         Add a comic to the database
         
+        The record is buffered and written in a batch with other records
+        (see rsr.utils.write_buffer); it counts as posted right away.
+        
         Args:
             comic_data (dict): Data to store in the database
-        
-        Returns:
-            pymongo.results.InsertOneResult: The result of the insert operation
         """
         # Ensure it has a timestamp
         if 'date' not in comic_data:
             comic_data['date'] = datetime.now()
-            
-        return self.posted.insert_one(comic_data)
+        
+        # Keep the loaded indexes in sync with the collection
+        for id_field, index in self._posted_indexes.items():
+            if id_field in comic_data:
+                index.add(comic_data[id_field])
+        
+        with metrics.stage('db'):
+            errors = self._posted_buffer.add(comic_data)
+        self._report_write_errors(errors)
+    
+    def flush_posted(self):
+        """
+        Write all buffered posted records to the database
+        """
+        with metrics.stage('db'):
+            errors = self._posted_buffer.flush()
+        self._report_write_errors(errors)
+    
+    def _report_write_errors(self, errors):
+        for error in errors:
+            self.log_error(f"Failed to store posted comic: {error}")
         
     def post_comic(self, image_url, caption="", is_album=False):
         """
@@ -83,18 +409,39 @@ class BaseScraper:
             is_album (bool): Whether this is a multi-image comic (album)
             
         Returns:
-            The result from the Telegram API
+            The result from the Telegram API, None on failure, or DUPLICATE
+            if fingerprint_images found the image among earlier posts (it
+            is not sent)
         """
         try:
             if is_album:
                 # For multi-image comics
                 return sendAlbums(self.channel_id, image_url, caption)
-            else:
-                # For single-image comics
-                return sendPhoto(self.channel_id, image_url, caption)
+            
+            fp = self._fingerprint(image_url) if self.fingerprint_images else None
+            if fp is not None:
+                duplicate = fingerprints.find_duplicate(self.posted.name, fp, image_url)
+                if duplicate is not None:
+                    print(f"{self.comic_name}: {image_url} was already posted as {duplicate.get('image_url')}, skipping")
+                    return DUPLICATE
+            
+            # For single-image comics
+            result = sendPhoto(self.channel_id, image_url, caption, normalize=self.normalize_images)
+            if fp is not None and result is not None and result.ok:
+                fingerprints.remember(self.posted.name, image_url, fp)
+            return result
         except Exception as e:
+            self.error_count += 1
             send_message(botapi, adminchat, f"{self.comic_name} error posting comic: {str(e)}")
             return None
+    
+    def _fingerprint(self, image_url):
+        # A failed partial download only means the image is not checked
+        try:
+            return fingerprints.fingerprint(image_url)
+        except Exception as e:
+            print(f"{self.comic_name}: could not fingerprint {image_url}: {str(e)}")
+            return None
             
     def log_success(self, count):
         """
@@ -113,4 +460,5 @@ class BaseScraper:
         Args:
             message (str): Error message
         """
+        self.error_count += 1
         send_message(botapi, adminchat, f"{self.comic_name}: {message}") 
\ No newline at end of file
@@ -3,6 +3,8 @@ Scraper for Extra Fabulous Comics webcomic
 """
 from datetime import datetime
 
+from bs4 import SoupStrainer
+
 from rsr.scrapers.base import BaseScraper
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
@@ -13,6 +15,12 @@ class EfcScraper(BaseScraper):
     Scraper for Extra Fabulous Comics webcomic
     """
     
+    # Only the titles and images of the page are used
+    parse_scope = SoupStrainer(['h2', 'img'])
+    
+    # Comics are stored with their title slug in 'url'
+    id_field = 'url'
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('efc', comics_channel)
@@ -33,7 +41,7 @@ class EfcScraper(BaseScraper):
             self.log_error("Website request timed out")
             return numberposted
         
-        soup = makesoup(request['request'])
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # This is a Wix site now with a different structure
             # First try to find the comic by title and number
@@ -138,4 +146,5 @@ class EfcScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = EfcScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
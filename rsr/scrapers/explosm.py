@@ -4,6 +4,8 @@ Scraper for Cyanide & Happiness webcomic
 from datetime import datetime
 import re
 
+from bs4 import SoupStrainer
+
 from rsr.scrapers.base import BaseScraper
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
@@ -14,6 +16,12 @@ class ExplosmScraper(BaseScraper):
     Scraper for Cyanide & Happiness webcomic
     """
     
+    # The comic is found among the page's images
+    parse_scope = SoupStrainer('img')
+    
+    # Comics are stored with their ID in 'url'
+    id_field = 'url'
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('explosm', comics_channel)
@@ -34,7 +42,7 @@ class ExplosmScraper(BaseScraper):
             self.log_error("Website request timed out")
             return numberposted
         
-        soup = makesoup(request['request'])
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # Find all images
             img_tags = soup.find_all('img')
@@ -91,4 +99,5 @@ class ExplosmScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = ExplosmScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
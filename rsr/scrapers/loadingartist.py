@@ -2,10 +2,12 @@
 Scraper for Loading Artist webcomic
 """
 from datetime import datetime
-import requests
 
-from rsr.scrapers.base import BaseScraper
+from bs4 import SoupStrainer
+
+from rsr.scrapers.base import BaseScraper, DUPLICATE
 from rsr.utils.parsers import makesoup
+from rsr.utils.session import get_session
 from rsr.config import botapi, adminchat, comics_channel
 
 class LoadingArtistScraper(BaseScraper):
@@ -13,6 +15,15 @@ class LoadingArtistScraper(BaseScraper):
     Scraper for Loading Artist webcomic
     """
     
+    # Only images and links are used
+    parse_scope = SoupStrainer(['img', 'a'])
+    
+    # Comics are stored with their image URL in 'url'
+    id_field = 'url'
+    
+    # The same artwork is served under several image URLs
+    fingerprint_images = True
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('la', comics_channel)
@@ -30,13 +41,13 @@ class LoadingArtistScraper(BaseScraper):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
-        request = requests.get(self.url, headers=headers)
+        request = get_session().get(self.url, headers=headers)
         
         if not request.ok:
             self.log_error("Website request failed")
             return numberposted
         
-        soup = makesoup(request)
+        soup = makesoup(request, self.parse_scope)
         try:
             # Find all images
             img_tags = soup.find_all('img')
@@ -62,7 +73,7 @@ class LoadingArtistScraper(BaseScraper):
                     comic_link = f"https://loadingartist.com{comic_link}"
                 
                 # Visit the comic page to get the full image
-                comic_request = requests.get(comic_link, headers=headers)
+                comic_request = get_session().get(comic_link, headers=headers)
                 if comic_request.ok:
                     comic_soup = makesoup(comic_request)
                     
@@ -111,7 +122,14 @@ class LoadingArtistScraper(BaseScraper):
             caption = f"Loading Artist: {comic_title}\n\n[Link]({permalink})"
             
             # Post the comic
-            self.post_comic(comic_img, caption)
+            result = self.post_comic(comic_img, caption)
+            if result is DUPLICATE:
+                # Record the new URL so it is not fingerprinted again
+                self.add_to_posted({'url': comic_img, 'skipped': 'duplicate', 'date': datetime.now()})
+                return numberposted
+            if not self.sent(result):
+                # Not recorded, so the next run tries again
+                return numberposted
             
             # Add to database
             self.add_to_posted({
@@ -134,4 +152,5 @@ class LoadingArtistScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = LoadingArtistScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
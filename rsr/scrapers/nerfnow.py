@@ -3,9 +3,10 @@ Scraper for Nerf Now webcomic
 """
 from datetime import datetime
 import re
-import requests
 
-from rsr.scrapers.base import BaseScraper
+from bs4 import SoupStrainer
+
+from rsr.scrapers.base import BaseScraper, UnpostableComic
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
 from rsr.config import comics_channel
@@ -15,6 +16,15 @@ class NerfNowScraper(BaseScraper):
     Scraper for Nerf Now webcomic
     """
     
+    # Only the archive's list entries are used
+    parse_scope = SoupStrainer('li')
+    
+    # Comics are stored with their number in 'url'
+    id_field = 'url'
+    
+    # Comic pages do not change once published
+    cache_ttl = 30 * 24 * 3600
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('NerfNow', comics_channel)
@@ -23,21 +33,35 @@ class NerfNowScraper(BaseScraper):
     
     def check_for_updates(self):
         """
-        Check for and post new Nerf Now comics
+        Check for and post new Nerf Now comics, including any missed since
+        the last run
         Returns number of new comics posted
         """
-        numberposted = 0
+        return self.catch_up()
+    
+    def get_candidates(self):
+        """
+        List the comics on the archive page
+        
+        Returns:
+            list: Dicts with the comic 'id' and archive 'url', newest first
+        """
+        candidates = []
         
         # Request the archive page
         print(f"Requesting URL: {self.url}")
-        request = handleRequest(self.url)
+        request = self.conditional_request(self.url)
         
         if request['timeout']:
             self.log_error("Website request timed out")
             print("Website request timed out")
-            return numberposted
+            return candidates
         
-        soup = makesoup(request['request'])
+        if request['not_modified']:
+            print("Archive not modified since last run")
+            return candidates
+        
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # Find all li tags that contain comic links
             li_tags = soup.find_all('li')
@@ -46,90 +70,26 @@ class NerfNowScraper(BaseScraper):
             if not li_tags or len(li_tags) == 0:
                 self.log_error("No li tags found")
                 print("No li tags found")
-                return numberposted
-                
-            # Print the first 5 li tags to see what they contain
-            for i, li in enumerate(li_tags[:5]):
-                print(f"Li tag {i}: {li}")
-                if li.a and 'href' in li.a.attrs:
-                    print(f"  Link: {li.a['href']}")
+                return candidates
                 
             if not li_tags[0] or not li_tags[0].a or 'href' not in li_tags[0].a.attrs:
                 self.log_error("Failed to parse archive page")
                 print("Failed to parse archive page - first li tag doesn't have a link")
-                return numberposted
+                return candidates
                 
-            # Get the latest comic URL
-            comic_url = li_tags[0].a['href']
-            print(f"Latest comic URL: {comic_url}")
+            for li in li_tags:
+                if not li.a or 'href' not in li.a.attrs:
+                    continue
+                comic_url = li.a['href']
+                comic_id_match = re.findall(r'/+comic/(\d+)', comic_url)
+                if comic_id_match:
+                    candidates.append({'id': comic_id_match[0], 'url': comic_url})
             
-            comic_id_match = re.findall(r'/+comic/(\d+)', comic_url)
-            
-            if not comic_id_match:
+            if not candidates:
                 self.log_error("Failed to extract comic ID from URL")
-                print(f"Failed to extract comic ID from URL: {comic_url}")
-                return numberposted
-                
-            comic_id = comic_id_match[0]
-            print(f"Extracted comic ID: {comic_id}")
-            
-            # Check if we've already seen this comic
-            if self.is_already_posted(comic_id, 'url'):
-                print(f"Comic ID {comic_id} already posted")
-                return numberposted
-            
-            # Visit the comic page to get the image
-            permalink = f"http://www.nerfnow.com/comic/{comic_id}"
-            print(f"Requesting permalink: {permalink}")
-            comic_request = requests.get(permalink)
-            comic_soup = makesoup(comic_request)
-            
-            # Find the comic image
-            comic_div = comic_soup.find('div', id="comic")
-            if not comic_div:
-                print("Could not find div with id='comic'")
-                if comic_soup.find('div', id="comix"):
-                    print("Found div with id='comix' instead")
-                    comic_div = comic_soup.find('div', id="comix")
-            
-            if not comic_div or not comic_div.img or 'src' not in comic_div.img.attrs:
-                self.log_error("Failed to find comic image")
-                print("Failed to find comic image")
-                # Print some of the HTML to debug
-                print(f"Page HTML excerpt: {str(comic_soup)[:500]}...")
-                return numberposted
-                
-            image_url = comic_div.img['src']
-            print(f"Found image URL: {image_url}")
-            
-            # Make sure the image URL is absolute
-            if not image_url.startswith('http'):
-                image_url = f"http://www.nerfnow.com{image_url}"
-                print(f"Converted to absolute URL: {image_url}")
-            
-            # Find a title if available
-            title_elem = comic_soup.find(['h1', 'h2', 'h3'], class_='title') or comic_soup.find('title')
-            title = title_elem.text.strip() if title_elem else "Nerf Now"
-            print(f"Comic title: {title}")
-            
-            # Post the comic
-            print(f"Posting comic with caption: Nerf Now: {title}\n\n[Link]({permalink})")
-            caption = f"Nerf Now: {title}\n\n[Link]({permalink})"
-            self.post_comic(image_url, caption)
-            
-            # Add to database
-            self.add_to_posted({
-                'url': comic_id,
-                'title': title,
-                'image_url': image_url,
-                'permalink': permalink,
-                'date': datetime.now()
-            })
-            
-            numberposted += 1
-            
-            # Log success
-            self.log_success(numberposted)
+                print(f"Failed to extract comic ID from URL: {li_tags[0].a['href']}")
+            else:
+                print(f"Latest comic ID: {candidates[0]['id']}")
                 
         except Exception as e:
             self.log_error(f"Error processing comic: {str(e)}")
@@ -137,11 +97,82 @@ class NerfNowScraper(BaseScraper):
             import traceback
             traceback.print_exc()
         
-        return numberposted
+        return candidates
+    
+    def post_candidate(self, candidate):
+        """
+        Visit the comic page, post the comic and record it
+        
+        Args:
+            candidate (dict): Comic from get_candidates
+        
+        Returns:
+            bool: True if the comic was posted
+        
+        Raises:
+            UnpostableComic: If the page has no comic image
+        """
+        comic_id = candidate['id']
+        
+        # Visit the comic page to get the image
+        permalink = f"http://www.nerfnow.com/comic/{comic_id}"
+        print(f"Requesting permalink: {permalink}")
+        comic_request = self.cached_request(permalink)
+        
+        if comic_request['timeout']:
+            self.log_error("Permalink request timed out")
+            return False
+        if not comic_request['request'].ok:
+            self.log_error(f"Permalink returned status {comic_request['request'].status_code}")
+            return False
+        
+        comic_soup = makesoup(comic_request['request'])
+        
+        # Find the comic image
+        comic_div = comic_soup.find('div', id="comic")
+        if not comic_div:
+            print("Could not find div with id='comic'")
+            if comic_soup.find('div', id="comix"):
+                print("Found div with id='comix' instead")
+                comic_div = comic_soup.find('div', id="comix")
+        
+        if not comic_div or not comic_div.img or 'src' not in comic_div.img.attrs:
+            # Print some of the HTML to debug
+            print(f"Page HTML excerpt: {str(comic_soup)[:500]}...")
+            raise UnpostableComic("no comic image on the page")
+        
+        image_url = comic_div.img['src']
+        print(f"Found image URL: {image_url}")
+        
+        # Make sure the image URL is absolute
+        if not image_url.startswith('http'):
+            image_url = f"http://www.nerfnow.com{image_url}"
+            print(f"Converted to absolute URL: {image_url}")
+        
+        # Find a title if available
+        title_elem = comic_soup.find(['h1', 'h2', 'h3'], class_='title') or comic_soup.find('title')
+        title = title_elem.text.strip() if title_elem else "Nerf Now"
+        print(f"Comic title: {title}")
+        
+        # Post the comic
+        caption = f"Nerf Now: {title}\n\n[Link]({permalink})"
+        if not self.sent(self.post_comic(image_url, caption)):
+            return False
+        
+        # Add to database
+        self.add_to_posted({
+            'url': comic_id,
+            'title': title,
+            'image_url': image_url,
+            'permalink': permalink,
+            'date': datetime.now()
+        })
+        return True
 
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = NerfNowScraper()
     print(f"Running Nerf Now scraper test...")
     result = scraper.check_for_updates()
+    scraper.finish()
     print(f"Result: {result} new comics posted") 
\ No newline at end of file
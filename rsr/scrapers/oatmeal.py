@@ -4,9 +4,9 @@ Scraper for The Oatmeal webcomic
 from datetime import datetime
 import re
 
-from rsr.scrapers.base import BaseScraper
+from rsr.scrapers.base import BaseScraper, UnpostableComic
 from rsr.utils.http import handleRequest
-from rsr.utils.parsers import makexmlsoup, makesoup
+from rsr.utils.parsers import iterfeed, makesoup
 from rsr.utils.telegram import send_message
 from rsr.config import botapi, adminchat, comics_channel
 
@@ -16,6 +16,12 @@ class OatmealScraper(BaseScraper):
     Uses RSS feed and direct scraping for multi-image comics
     """
     
+    # Comics are stored with their slug in 'comic_id'
+    id_field = 'comic_id'
+    
+    # Single-image comics are often long strips
+    normalize_images = True
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('theoatmeal', comics_channel)
@@ -24,88 +30,107 @@ class OatmealScraper(BaseScraper):
     
     def check_for_updates(self):
         """
-        Check for and post new Oatmeal comics
+        Check for and post new Oatmeal comics, including any missed since
+        the last run
         Returns number of new comics posted
         """
-        numberposted = 0
+        return self.catch_up()
+    
+    def get_candidates(self):
+        """
+        List the comics in the RSS feed that are newer than the last posted one
+        
+        Returns:
+            list: Comic information dicts, newest first
+        """
+        candidates = []
         
-        # Request the RSS feed
-        request = handleRequest(self.rss_url)
+        # Request the RSS feed (304 when nothing changed since the last run),
+        # streamed so only the entries read below are downloaded
+        request = self.conditional_request(self.rss_url, stream=True)
         
         if request['timeout']:
             self.log_error("RSS feed request timed out")
-            return numberposted
+            return candidates
         
-        # Parse the XML
-        soup = makexmlsoup(request['request'])
+        if request['not_modified']:
+            return candidates
         
-        # Find all items in the RSS feed
-        items = soup.find_all('item')
+        found_items = False
+        for item in iterfeed(request['request']):
+            found_items = True
         
-        if not items:
-            self.log_error("No items found in RSS feed")
-            return numberposted
+            # Extract comic details
+            comic_info = self._extract_comic_info(item)
+            
+            # Skip if we couldn't find a comic ID
+            if 'comic_id' not in comic_info:
+                self.log_error("Could not extract comic ID from permalink")
+                continue
+            
+            # Everything from the first posted comic on is older, so the
+            # rest of the feed is not parsed
+            if self.is_already_posted(comic_info['comic_id']):
+                break
+            
+            comic_info['id'] = comic_info['comic_id']
+            candidates.append(comic_info)
         
-        # Get the latest item (first one)
-        latest_item = items[0]
+        if not found_items:
+            self.log_error("No items found in RSS feed")
+        return candidates
         
-        # Extract comic details
-        comic_info = self._extract_comic_info(latest_item)
+    def post_candidate(self, comic_info):
+        """
+        Visit the comic page, post all of its images and record the comic
         
-        # Skip if we couldn't find a comic ID
-        if 'comic_id' not in comic_info:
-            self.log_error("Could not extract comic ID from permalink")
-            return numberposted
+        Args:
+            comic_info (dict): Comic information from get_candidates
         
-        # Check if we've already posted this comic
-        if self.is_already_posted(comic_info['comic_id']):
-            # Already posted this comic
-            return numberposted
+        Returns:
+            bool: True if the comic was posted
         
+        Raises:
+            UnpostableComic: If the comic has no page or no images
+        """
         # If we have a permalink, visit the comic page to get all images
+        if 'permalink' not in comic_info:
+            raise UnpostableComic("no permalink in the feed item")
+        
+        # Get all image URLs from the comic page
+        image_urls = self._get_comic_images(comic_info['permalink'])
+        
+        if image_urls is None:
+            return False
+        if not image_urls:
+            raise UnpostableComic("no valid comic images on the page")
+        
+        # Prepare the caption
+        title_text = f"The Oatmeal: {comic_info['title']}"
         if 'permalink' in comic_info:
-            # Get all image URLs from the comic page
-            image_urls = self._get_comic_images(comic_info['permalink'])
+            title_text += f"\n\n[Link]({comic_info['permalink']})"
             
-            if not image_urls:
-                self.log_error("No valid comic images found")
-                return numberposted
+        # Post the comic (as album if multiple images)
+        is_album = len(image_urls) > 1
+        if not self.sent(self.post_comic(image_urls, title_text, is_album=is_album)):
+            return False
             
-            # Post the comic to Telegram
-            try:
-                # Prepare the caption
-                title_text = f"The Oatmeal: {comic_info['title']}"
-                if 'permalink' in comic_info:
-                    title_text += f"\n\n[Link]({comic_info['permalink']})"
-                
-                # Post the comic (as album if multiple images)
-                is_album = len(image_urls) > 1
-                self.post_comic(image_urls, title_text, is_album=is_album)
-                
-                # Add to database
-                self.add_to_posted({
-                    'comic_id': comic_info['comic_id'],
-                    'title': comic_info.get('title', 'The Oatmeal'),
-                    'url': comic_info.get('permalink', ''),
-                    'image_urls': image_urls,
-                    'date': datetime.now()
-                })
-                
-                numberposted += 1
-                
-                # Log success
-                self.log_success(numberposted)
-            except Exception as e:
-                self.log_error(f"Error posting comic: {str(e)}")
-        
-        return numberposted
+        # Add to database
+        self.add_to_posted({
+            'comic_id': comic_info['comic_id'],
+            'title': comic_info.get('title', 'The Oatmeal'),
+            'url': comic_info.get('permalink', ''),
+            'image_urls': image_urls,
+            'date': datetime.now()
+        })
+        return True
     
     def _extract_comic_info(self, item):
         """
         Extract comic details from RSS item
         
         Args:
-            item: RSS item element
+            item (dict): Feed entry from iterfeed
             
         Returns:
             dict: Comic information
@@ -113,14 +138,12 @@ class OatmealScraper(BaseScraper):
         comic_info = {}
         
         # Get title
-        title_elem = item.find('title')
-        if title_elem:
-            comic_info['title'] = title_elem.text.strip()
+        if item['title']:
+            comic_info['title'] = item['title']
         
         # Get link/permalink
-        link_elem = item.find('link')
-        if link_elem:
-            comic_info['permalink'] = link_elem.text.strip()
+        if item['link']:
+            comic_info['permalink'] = item['link']
             
             # Extract comic ID from permalink - try multiple patterns
             # Try first standard format: /comics/[comic_id]
@@ -143,9 +166,8 @@ class OatmealScraper(BaseScraper):
                         comic_info['comic_id'] = md5(comic_info['permalink'].encode()).hexdigest()[:16]
         
         # Get publication date
-        pubdate_elem = item.find('pubDate')
-        if pubdate_elem:
-            comic_info['date'] = pubdate_elem.text.strip()
+        if item['pubDate']:
+            comic_info['date'] = item['pubDate']
             
         return comic_info
     
@@ -157,7 +179,8 @@ class OatmealScraper(BaseScraper):
             permalink (str): URL of the comic page
             
         Returns:
-            list: List of image URLs
+            list or None: List of image URLs (empty if the page has none),
+                or None if the page could not be fetched
         """
         # Make sure we use the no_popup version for better parsing
         if '?' not in permalink:
@@ -169,7 +192,10 @@ class OatmealScraper(BaseScraper):
         
         if page_request['timeout']:
             self.log_error("Comic page request timed out")
-            return []
+            return None
+        if not page_request['request'].ok:
+            self.log_error(f"Comic page returned status {page_request['request'].status_code}")
+            return None
         
         page_soup = makesoup(page_request['request'])
         
@@ -181,14 +207,14 @@ class OatmealScraper(BaseScraper):
             comic_content = page_soup.find('div', class_='content') or page_soup.find('div', class_='comic')
         
         if not comic_content:
-            self.log_error("Could not find comic content container")
+            print("Could not find comic content container")
             return []
         
         # Find all images in the comic content
         images = comic_content.find_all('img')
         
         if not images:
-            self.log_error("No images found in comic content")
+            print("No images found in comic content")
             return []
         
         # Extract all image URLs
@@ -219,4 +245,5 @@ class OatmealScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = OatmealScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
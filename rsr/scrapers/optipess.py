@@ -3,7 +3,9 @@ Scraper for Optipess webcomic
 """
 from datetime import datetime
 
-from rsr.scrapers.base import BaseScraper
+from bs4 import SoupStrainer
+
+from rsr.scrapers.base import BaseScraper, DUPLICATE
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
 from rsr.config import botapi, adminchat, comics_channel
@@ -13,6 +15,15 @@ class OptipessScraper(BaseScraper):
     Scraper for Optipess webcomic
     """
     
+    # Only images, the title and the canonical link are used
+    parse_scope = SoupStrainer(['img', 'h1', 'link'])
+    
+    # Comics are stored with their image URL in 'url'
+    id_field = 'url'
+    
+    # The same artwork is served under several image URLs
+    fingerprint_images = True
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('Optipess', comics_channel)
@@ -33,7 +44,7 @@ class OptipessScraper(BaseScraper):
             self.log_error("Website request timed out")
             return numberposted
         
-        soup = makesoup(request['request'])
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # Find the first/top image which is likely to be the latest comic
             img_tags = soup.find_all('img')
@@ -74,7 +85,14 @@ class OptipessScraper(BaseScraper):
             caption = f"Optipess: {title_text}\n\n[Link]({permalink})"
             
             # Post the comic
-            self.post_comic(comic_url, caption)
+            result = self.post_comic(comic_url, caption)
+            if result is DUPLICATE:
+                # Record the new URL so it is not fingerprinted again
+                self.add_to_posted({'url': comic_url, 'skipped': 'duplicate', 'date': datetime.now()})
+                return numberposted
+            if not self.sent(result):
+                # Not recorded, so the next run tries again
+                return numberposted
             
             # Add to database
             self.add_to_posted({
@@ -97,4 +115,5 @@ class OptipessScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = OptipessScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
@@ -3,7 +3,9 @@ Scraper for Perry Bible Fellowship webcomic
 """
 from datetime import datetime
 
-from rsr.scrapers.base import BaseScraper
+from bs4 import SoupStrainer
+
+from rsr.scrapers.base import BaseScraper, UnpostableComic
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
 from rsr.config import botapi, adminchat, comics_channel
@@ -13,6 +15,16 @@ class PbfScraper(BaseScraper):
     Scraper for Perry Bible Fellowship webcomic
     """
     
+    # Only the archive's gallery entries (spans) are used. Class filters
+    # are not used here: strainers see the unsplit class attribute
+    parse_scope = SoupStrainer('span')
+    
+    # Comics are stored with their slug in 'url'
+    id_field = 'url'
+    
+    # Comic pages do not change once published
+    cache_ttl = 30 * 24 * 3600
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('pbf', comics_channel)
@@ -21,104 +33,130 @@ class PbfScraper(BaseScraper):
     
     def check_for_updates(self):
         """
-        Check for and post new PBF comics
+        Check for and post new PBF comics, including any missed since the
+        last run
         Returns number of new comics posted
         """
-        numberposted = 0
+        return self.catch_up()
+    
+    def get_candidates(self):
+        """
+        List the comics on the archive page
+        
+        Returns:
+            list: Dicts with the comic 'id', 'link' and 'title', newest first
+        """
+        candidates = []
         
-        # Request the archive page
-        request = handleRequest(self.url)
+        # Request the archive page (304 when nothing changed since the last run)
+        request = self.conditional_request(self.url)
         
         if request['timeout']:
             self.log_error("Archive page request timed out")
-            return numberposted
+            return candidates
         
-        soup = makesoup(request['request'])
+        if request['not_modified']:
+            return candidates
+        
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # Get the comics on the archive page
             comics = soup.find_all('span', class_='thumbnail_gallery_item')
             
             if not comics or len(comics) == 0:
                 self.log_error("Failed to find comics on archive page")
-                return numberposted
-            
-            # Get the most recent comic (first in the list)
-            latest_comic = comics[0]
-            
-            # Extract the comic details
-            comic_link = None
-            comic_title = None
-            
-            if latest_comic and latest_comic.a:
-                comic_link = latest_comic.a.get('href')
-                title_div = latest_comic.find('div', class_='thumbnail_post_title')
-                if title_div:
-                    comic_title = title_div.text.strip()
-            
-            if not comic_link or not comic_title:
-                self.log_error("Failed to extract comic link or title")
-                return numberposted
-            
-            # Extract the comic ID from the URL
-            comic_id = comic_link.split('/')[-2] if comic_link.endswith('/') else comic_link.split('/')[-1]
-            
-            # Check if we've already seen this comic
-            if self.is_already_posted(comic_id, 'url'):
-                return numberposted
-            
-            # Visit the permalink to get the actual image
-            permalink_request = handleRequest(comic_link)
-            
-            if permalink_request['timeout']:
-                self.log_error("Permalink request timed out")
-                return numberposted
-            
-            permalink_soup = makesoup(permalink_request['request'])
+                return candidates
             
-            # Try multiple methods to find the image
-            img_url = None
+            for comic in comics:
+                # Extract the comic details
+                comic_link = None
+                comic_title = None
             
-            # Method 1: Look for the og:image meta tag
-            og_image = permalink_soup.find('meta', property='og:image')
-            if og_image and 'content' in og_image.attrs:
-                img_url = og_image['content']
+                if comic.a:
+                    comic_link = comic.a.get('href')
+                    title_div = comic.find('div', class_='thumbnail_post_title')
+                    if title_div:
+                        comic_title = title_div.text.strip()
             
-            # Method 2: Look for images in the content area
-            if not img_url:
-                content_div = permalink_soup.find('div', class_='entry-content')
-                if content_div:
-                    comic_img = content_div.find('img')
-                    if comic_img and 'src' in comic_img.attrs:
-                        img_url = comic_img['src']
+                if not comic_link or not comic_title:
+                    continue
             
-            if not img_url:
-                self.log_error("Failed to find comic image")
-                return numberposted
+                # Extract the comic ID from the URL
+                comic_id = comic_link.split('/')[-2] if comic_link.endswith('/') else comic_link.split('/')[-1]
+                candidates.append({'id': comic_id, 'link': comic_link, 'title': comic_title})
             
-            # Post the comic
-            caption = f"Perry Bible Fellowship: {comic_title}\n\n[Link]({comic_link})"
-            self.post_comic(img_url, caption)
-            
-            # Add to database
-            self.add_to_posted({
-                'url': comic_id,
-                'title': comic_title,
-                'image_url': img_url,
-                'permalink': comic_link,
-                'date': datetime.now()
-            })
-            
-            numberposted += 1
-            
-            # Log success
-            self.log_success(numberposted)
+            if not candidates:
+                self.log_error("Failed to extract comic link or title")
                 
         except Exception as e:
             self.log_error(f"Error processing comic: {str(e)}")
         
-        return numberposted
+        return candidates
+    
+    def post_candidate(self, candidate):
+        """
+        Visit the comic's permalink, post the comic and record it
+        
+        Args:
+            candidate (dict): Comic from get_candidates
+        
+        Returns:
+            bool: True if the comic was posted
+        
+        Raises:
+            UnpostableComic: If the page has no comic image
+        """
+        comic_link = candidate['link']
+        comic_title = candidate['title']
+        
+        # Visit the permalink to get the actual image
+        permalink_request = self.cached_request(comic_link)
+        
+        if permalink_request['timeout']:
+            self.log_error("Permalink request timed out")
+            return False
+        if not permalink_request['request'].ok:
+            self.log_error(f"Permalink returned status {permalink_request['request'].status_code}")
+            return False
+        
+        permalink_soup = makesoup(permalink_request['request'])
+        
+        # Try multiple methods to find the image
+        img_url = None
+        
+        # Method 1: Look for the og:image meta tag
+        og_image = permalink_soup.find('meta', property='og:image')
+        if og_image and 'content' in og_image.attrs:
+            img_url = og_image['content']
+        
+        # Method 2: Look for images in the content area
+        if not img_url:
+            content_div = permalink_soup.find('div', class_='entry-content')
+            if content_div:
+                comic_img = content_div.find('img')
+                if comic_img and 'src' in comic_img.attrs:
+                    img_url = comic_img['src']
+        
+        if not img_url:
+            raise UnpostableComic("no comic image on the page")
+        
+        # Post the comic
+        caption = f"Perry Bible Fellowship: {comic_title}\n\n[Link]({comic_link})"
+        if not self.sent(self.post_comic(img_url, caption)):
+            return False
+        
+        # Add to database
+        self.add_to_posted({
+            'url': candidate['id'],
+            'title': comic_title,
+            'image_url': img_url,
+            'permalink': comic_link,
+            'date': datetime.now()
+        })
+        return True
 
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = PbfScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
@@ -4,9 +4,10 @@ Scraper for Pie Comic webcomic
 from datetime import datetime
 import re
 
-from rsr.scrapers.base import BaseScraper
+from rsr.scrapers.base import BaseScraper, UnpostableComic
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
+from rsr.utils.tumblr import resolve_image
 from rsr.config import botapi, adminchat, comics_channel
 
 class PieComicScraper(BaseScraper):
@@ -14,6 +15,9 @@ class PieComicScraper(BaseScraper):
     Scraper for Pie Comic webcomic
     """
     
+    # Posts are stored with their Tumblr post ID in 'post_id'
+    id_field = 'post_id'
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('piecomic', comics_channel)
@@ -22,17 +26,28 @@ class PieComicScraper(BaseScraper):
     
     def check_for_updates(self):
         """
-        Check for and post new Pie Comic comics
+        Check for and post new Pie Comic comics, including any missed since
+        the last run
         Returns number of new comics posted
         """
-        numberposted = 0
+        return self.catch_up()
+    
+    def get_candidates(self):
+        """
+        List the posts on the front page
+        
+        Returns:
+            list: Dicts with the post 'id', 'element' and 'permalink',
+                newest first
+        """
+        candidates = []
         
         # Request the website
         request = handleRequest(self.url)
         
         if request['timeout']:
             self.log_error("Website request timed out")
-            return numberposted
+            return candidates
         
         soup = makesoup(request['request'])
         try:
@@ -41,7 +56,7 @@ class PieComicScraper(BaseScraper):
             
             if not postmeta_divs:
                 self.log_error("No post metadata found")
-                return numberposted
+                return candidates
             
             # Find all posts with timestamps
             recent_posts = []
@@ -92,150 +107,130 @@ class PieComicScraper(BaseScraper):
             
             if not recent_posts:
                 self.log_error("No posts with timestamps found")
-                return numberposted
+                return candidates
             
             # Sort posts by recency (lowest score first)
             recent_posts.sort(key=lambda post: post["recency_score"])
             
-            # Get the most recent post
-            latest_post = recent_posts[0]["element"]
-            
-            # Get the permalink and extract post ID
-            permalink = recent_posts[0]["permalink"]
-            post_id_match = re.search(r"/post/(\d+)", permalink)
-            
-            if not post_id_match:
+            for recent_post in recent_posts:
+                # Get the permalink and extract post ID
+                permalink = recent_post["permalink"]
+                post_id_match = re.search(r"/post/(\d+)", permalink or "")
+                if post_id_match:
+                    candidates.append({
+                        'id': post_id_match.group(1),
+                        'element': recent_post["element"],
+                        'permalink': permalink
+                    })
+            
+            if not candidates:
                 self.log_error("Could not extract post ID from permalink")
-                return numberposted
                 
-            post_id = post_id_match.group(1)
-            
-            # Check if we've already seen this comic
-            if self.is_already_posted(post_id, 'post_id'):
-                return numberposted
-            
-            # Find the image in the post
-            images = latest_post.find_all("img")
-            image_url = None
-            
-            for img in images:
-                if 'src' in img.attrs:
-                    src = img['src']
-                    
-                    # Skip common UI elements
-                    if any(x in src.lower() for x in ['avatar', 'icon', 'logo', 'emoji']):
-                        continue
-                    
-                    # Skip very small images
-                    is_small = False
-                    if 'width' in img.attrs and img['width'].isdigit() and int(img['width']) < 100:
-                        is_small = True
-                    if 'height' in img.attrs and img['height'].isdigit() and int(img['height']) < 100:
-                        is_small = True
-                    
-                    if not is_small:
-                        # For Tumblr, replace _500 with _1280 for higher resolution
-                        if "_500" in src:
-                            high_res_url = src.replace("_500", "_1280")
-                        else:
-                            # General approach: remove size suffixes
-                            high_res_url = re.sub(r'_\d+(\.\w+)$', r'\1', src)
+        except Exception as e:
+            self.log_error(f"Error processing comic: {str(e)}")
+        
+        return candidates
+    
+    def post_candidate(self, candidate):
+        """
+        Find the post's image, post the comic and record it
+        
+        Args:
+            candidate (dict): Post from get_candidates
+        
+        Returns:
+            bool: True if the comic was posted
+        
+        Raises:
+            UnpostableComic: For posts without an image (e.g. text posts)
+        """
+        post_id = candidate['id']
+        latest_post = candidate['element']
+        permalink = candidate['permalink']
+        
+        # Find the image in the post
+        images = latest_post.find_all("img")
+        image_url = None
+        
+        for img in images:
+            if 'src' in img.attrs:
+                src = img['src']
+                
+                # Skip common UI elements
+                if any(x in src.lower() for x in ['avatar', 'icon', 'logo', 'emoji']):
+                    continue
+                
+                # Skip very small images
+                is_small = False
+                if 'width' in img.attrs and img['width'].isdigit() and int(img['width']) < 100:
+                    is_small = True
+                if 'height' in img.attrs and img['height'].isdigit() and int(img['height']) < 100:
+                    is_small = True
+                
+                if not is_small:
+                    # Use the largest size of this image that exists
+                    image_url = resolve_image(src, post_id)
+                    if image_url:
+                        break
+        
+        # If no image found directly, try the permalink page
+        if not image_url and permalink:
+            permalink_request = handleRequest(permalink)
+            
+            if permalink_request['timeout']:
+                self.log_error("Permalink request timed out")
+                return False
+            else:
+                permalink_soup = makesoup(permalink_request['request'])
+                
+                # Try to find images on the permalink page
+                permalink_images = permalink_soup.find_all("img")
+                
+                for img in permalink_images:
+                    if 'src' in img.attrs:
+                        src = img['src']
+                        
+                        # Skip common UI elements
+                        if any(x in src.lower() for x in ['avatar', 'icon', 'logo', 'emoji']):
+                            continue
                         
-                        # If the URL has parameters, extract the base URL
-                        if '?' in high_res_url:
-                            high_res_url = high_res_url.split('?')[0]
+                        # Skip very small images
+                        is_small = False
+                        if 'width' in img.attrs and img['width'].isdigit() and int(img['width']) < 100:
+                            is_small = True
+                        if 'height' in img.attrs and img['height'].isdigit() and int(img['height']) < 100:
+                            is_small = True
                         
-                        # Test if this URL works
-                        test_request = handleRequest(high_res_url)
-                        if not test_request['timeout'] and test_request['request'].status_code == 200:
-                            image_url = high_res_url
+                        if not is_small:
+                            # Use the largest size of this image that exists
+                            image_url = resolve_image(src, post_id) or src
                             break
-                        else:
-                            # If high-res doesn't work, try the original URL
-                            test_request = handleRequest(src)
-                            if not test_request['timeout'] and test_request['request'].status_code == 200:
-                                image_url = src
-                                break
-                            else:
-                                # Try different common sizes
-                                for size in ["_1280", "_640", "_540", "_500", "_400", "_250"]:
-                                    size_url = re.sub(r'_\d+(\.\w+)$', f'{size}\\1', src)
-                                    test_request = handleRequest(size_url)
-                                    if not test_request['timeout'] and test_request['request'].status_code == 200:
-                                        image_url = size_url
-                                        break
-            
-            # If no image found directly, try the permalink page
-            if not image_url and permalink:
-                permalink_request = handleRequest(permalink)
-                
-                if not permalink_request['timeout']:
-                    permalink_soup = makesoup(permalink_request['request'])
-                    
-                    # Try to find images on the permalink page
-                    permalink_images = permalink_soup.find_all("img")
-                    
-                    for img in permalink_images:
-                        if 'src' in img.attrs:
-                            src = img['src']
-                            
-                            # Skip common UI elements
-                            if any(x in src.lower() for x in ['avatar', 'icon', 'logo', 'emoji']):
-                                continue
-                            
-                            # Skip very small images
-                            is_small = False
-                            if 'width' in img.attrs and img['width'].isdigit() and int(img['width']) < 100:
-                                is_small = True
-                            if 'height' in img.attrs and img['height'].isdigit() and int(img['height']) < 100:
-                                is_small = True
-                            
-                            if not is_small:
-                                # For Tumblr, replace _500 with _1280 for higher resolution
-                                if "_500" in src:
-                                    high_res_url = src.replace("_500", "_1280")
-                                else:
-                                    # General approach: remove size suffixes
-                                    high_res_url = re.sub(r'_\d+(\.\w+)$', r'\1', src)
-                                
-                                if '?' in high_res_url:
-                                    high_res_url = high_res_url.split('?')[0]
-                                
-                                image_url = high_res_url
-                                break
-            
-            if not image_url:
-                self.log_error("Failed to find comic image")
-                return numberposted
-            
-            # Get the title
-            title_elem = latest_post.find(['h2', 'h3']) or latest_post.find(class_=re.compile("title"))
-            title = title_elem.text.strip() if title_elem else "Pie Comic"
-            
-            # Post the comic
-            caption = f"Pie Comic: {title}\n\n[Link]({permalink})"
-            self.post_comic(image_url, caption)
-            
-            # Add to database
-            self.add_to_posted({
-                'post_id': post_id,
-                'title': title,
-                'url': permalink,
-                'image_url': image_url,
-                'date': datetime.now()
-            })
-            
-            numberposted += 1
-            
-            # Log success
-            self.log_success(numberposted)
-                
-        except Exception as e:
-            self.log_error(f"Error processing comic: {str(e)}")
         
-        return numberposted
+        if not image_url:
+            raise UnpostableComic("no comic image in the post")
+        
+        # Get the title
+        title_elem = latest_post.find(['h2', 'h3']) or latest_post.find(class_=re.compile("title"))
+        title = title_elem.text.strip() if title_elem else "Pie Comic"
+        
+        # Post the comic
+        caption = f"Pie Comic: {title}\n\n[Link]({permalink})"
+        if not self.sent(self.post_comic(image_url, caption)):
+            return False
+        
+        # Add to database
+        self.add_to_posted({
+            'post_id': post_id,
+            'title': title,
+            'url': permalink,
+            'image_url': image_url,
+            'date': datetime.now()
+        })
+        
+        return True
 
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = PieComicScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
@@ -4,6 +4,8 @@ Scraper for Safely Endangered webcomic
 from datetime import datetime
 import re
 
+from bs4 import SoupStrainer
+
 from rsr.scrapers.base import BaseScraper
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
@@ -14,6 +16,15 @@ class SafelyEndangeredScraper(BaseScraper):
     Scraper for Safely Endangered webcomic
     """
     
+    # Comics are listed as articles (other layouts fall back to a full parse)
+    parse_scope = SoupStrainer('article')
+    
+    # Comics are stored with their post ID in 'comic_id'
+    id_field = 'comic_id'
+    
+    # Comics are tall vertical strips
+    normalize_images = True
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('safelyendangered', comics_channel)
@@ -34,7 +45,7 @@ class SafelyEndangeredScraper(BaseScraper):
             self.log_error("Website request timed out")
             return numberposted
         
-        soup = makesoup(request['request'])
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # The site appears to be a Shopify store with blogs
             # Comics are displayed in a grid with links and images
@@ -192,4 +203,5 @@ class SafelyEndangeredScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = SafelyEndangeredScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
@@ -6,9 +6,12 @@ import re
 import time
 import hashlib
 
+from bs4 import SoupStrainer
+
 from rsr.scrapers.base import BaseScraper
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
+from rsr.utils.tumblr import resolve_image
 from rsr.config import botapi, adminchat, comics_channel
 
 class SarahsScribblesScraper(BaseScraper):
@@ -16,6 +19,12 @@ class SarahsScribblesScraper(BaseScraper):
     Scraper for Sarah's Scribbles webcomic
     """
     
+    # Tumblr posts are articles (other themes fall back to a full parse)
+    parse_scope = SoupStrainer('article')
+    
+    # Comics are stored with their post ID (or an image hash) in 'comic_id'
+    id_field = 'comic_id'
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('sarahsscribbles', comics_channel)
@@ -36,7 +45,7 @@ class SarahsScribblesScraper(BaseScraper):
             self.log_error("Website request timed out")
             return numberposted
         
-        soup = makesoup(request['request'])
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # Tumblr structure: typically posts are in articles
             posts = soup.find_all("article") or soup.find_all(class_=re.compile("post|entry|tumblr-post"))
@@ -121,8 +130,7 @@ class SarahsScribblesScraper(BaseScraper):
             description = content_elem.get_text(strip=True) if content_elem else ""
             
             # Check by image URL first since it's the most reliable identifier
-            existing_by_image = self.posted.find_one({'image_url': image_url})
-            if existing_by_image:
+            if self.is_already_posted(image_url, 'image_url'):
                 return numberposted
             
             # Check if we've already seen this comic by comic_id
@@ -139,7 +147,9 @@ class SarahsScribblesScraper(BaseScraper):
                 caption += f"Source: Sarah's Scribbles"
             
             # Post the comic
-            self.post_comic(image_url, caption)
+            # Post the largest size of the image that exists; image_url
+            # itself stays the identifier stored in the database
+            self.post_comic(resolve_image(image_url, comic_id) or image_url, caption)
             
             # Add to database - explicitly avoid storing the homepage URL
             doc = {
@@ -169,4 +179,5 @@ class SarahsScribblesScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = SarahsScribblesScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
@@ -7,6 +7,7 @@ import re
 from rsr.scrapers.base import BaseScraper
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
+from rsr.utils.tumblr import resolve_image
 from rsr.config import comics_channel
 
 class SkeletonClawScraper(BaseScraper):
@@ -14,6 +15,9 @@ class SkeletonClawScraper(BaseScraper):
     Scraper for Skeleton Claw webcomic
     """
     
+    # Comics are stored with their Tumblr post ID in 'comic_id'
+    id_field = 'comic_id'
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('skeletonclaw', comics_channel)
@@ -107,14 +111,8 @@ class SkeletonClawScraper(BaseScraper):
                     if 'height' in img.attrs and img['height'].isdigit() and int(img['height']) < 100:
                         continue
                     
-                    # Get high-resolution version
-                    if '_.jpg' in img_url or '_1280.jpg' in img_url:
-                        # Already high resolution
-                        image_url = img_url
-                    else:
-                        # Try to get high-resolution version by removing size suffix
-                        high_res_url = re.sub(r'_\d+(\.\w+)$', r'\1', img_url)
-                        image_url = high_res_url
+                    # Get the largest size of this image that exists
+                    image_url = resolve_image(img_url, comic_id) or img_url
                     
                     break
             
@@ -152,4 +150,5 @@ class SkeletonClawScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = SkeletonClawScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
@@ -4,6 +4,8 @@ Scraper for Something Positive webcomic
 from datetime import datetime
 import re
 
+from bs4 import SoupStrainer
+
 from rsr.scrapers.base import BaseScraper
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
@@ -14,6 +16,12 @@ class SomethingPositiveScraper(BaseScraper):
     Scraper for Something Positive webcomic
     """
     
+    # Comics are posted as articles
+    parse_scope = SoupStrainer('article')
+    
+    # Comics are stored with their post ID in 'comic_id'
+    id_field = 'comic_id'
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('somethingpositive', comics_channel)
@@ -34,7 +42,7 @@ class SomethingPositiveScraper(BaseScraper):
             self.log_error("Website request timed out")
             return numberposted
         
-        soup = makesoup(request['request'])
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # Look for all article elements - Something Positive site uses WordPress
             articles = soup.find_all('article')
@@ -208,4 +216,5 @@ class SomethingPositiveScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = SomethingPositiveScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
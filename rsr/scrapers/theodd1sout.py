@@ -5,6 +5,8 @@ from datetime import datetime
 import re
 import json
 
+from bs4 import SoupStrainer
+
 from rsr.scrapers.base import BaseScraper
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
@@ -15,6 +17,12 @@ class TheOdd1sOutScraper(BaseScraper):
     Scraper for TheOdd1sOut webcomic
     """
     
+    # Only the main content area is used
+    parse_scope = SoupStrainer('main', attrs={'id': 'MainContent'})
+    
+    # Comics are stored with their slug in 'comic_id'
+    id_field = 'comic_id'
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('theodd1sout', comics_channel)
@@ -35,7 +43,7 @@ class TheOdd1sOutScraper(BaseScraper):
             self.log_error("Website request timed out")
             return numberposted
         
-        soup = makesoup(request['request'])
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # Find the main content area
             main_content = soup.find('main', id='MainContent')
@@ -145,4 +153,5 @@ class TheOdd1sOutScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = TheOdd1sOutScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
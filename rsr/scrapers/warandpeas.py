@@ -3,6 +3,8 @@ Scraper for War and Peas webcomic
 """
 from datetime import datetime
 
+from bs4 import SoupStrainer
+
 from rsr.scrapers.base import BaseScraper
 from rsr.utils.http import handleRequest
 from rsr.utils.parsers import makesoup
@@ -13,6 +15,12 @@ class WarAndPeasScraper(BaseScraper):
     Scraper for War and Peas webcomic
     """
     
+    # Comics are posted as articles
+    parse_scope = SoupStrainer('article')
+    
+    # Comics are stored with their slug in 'url'
+    id_field = 'url'
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('warandpeas', comics_channel)
@@ -33,7 +41,7 @@ class WarAndPeasScraper(BaseScraper):
             self.log_error("Website request timed out")
             return numberposted
         
-        soup = makesoup(request['request'])
+        soup = makesoup(request['request'], self.parse_scope)
         try:
             # Find all article elements - they contain the comics
             articles = soup.find_all('article')
@@ -131,4 +139,5 @@ class WarAndPeasScraper(BaseScraper):
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = WarAndPeasScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
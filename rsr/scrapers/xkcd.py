@@ -3,24 +3,25 @@ Scraper for XKCD webcomic
 """
 from datetime import datetime
 
-from rsr.scrapers.base import BaseScraper
-from rsr.utils.http import handleRequest
-from rsr.utils.telegram import send_message
-from rsr.config import botapi, adminchat, comics_channel
+from rsr.scrapers.async_base import AsyncScraper
+from rsr.config import comics_channel
 
-class XkcdScraper(BaseScraper):
+class XkcdScraper(AsyncScraper):
     """
     Scraper for XKCD webcomic
-    Uses direct JSON API provided by XKCD
+    Uses direct JSON API provided by XKCD; written as a coroutine
     """
     
+    # Comics are stored with their number in 'comic_id'
+    id_field = 'comic_id'
+    
     def __init__(self):
         # Initialize with database collection name and channel ID
         super().__init__('xkcd', comics_channel)
         self.api_url = "http://xkcd.com/info.0.json"
         self.comic_name = "XKCD"  # Override default name
     
-    def check_for_updates(self):
+    async def check_for_updates_async(self):
         """
         Check for and post new XKCD comics
         Returns number of new comics posted
@@ -28,10 +29,10 @@ class XkcdScraper(BaseScraper):
         numberposted = 0
         
         # Request the XKCD API
-        request = handleRequest(self.api_url)
+        request = await self.request_async(self.api_url)
         
         if request['timeout']:
-            self.log_error("API request timed out")
+            await self.log_error_async("API request timed out")
             return numberposted
         
         try:
@@ -44,7 +45,7 @@ class XkcdScraper(BaseScraper):
                 permalink = f"https://xkcd.com/{data['num']}/"
                 
                 # Check if we've already posted this comic
-                if not self.is_already_posted(data['num']):
+                if not await self.is_already_posted_async(data['num']):
                     # Format title - use a default if not available
                     title = data.get('title', 'Untitled')
                     
@@ -54,10 +55,10 @@ class XkcdScraper(BaseScraper):
                     comic_caption += f"[Link]({permalink})"
                     
                     # Post the new comic
-                    self.post_comic(data['img'], comic_caption)
+                    await self.post_comic_async(data['img'], comic_caption)
                     
                     # Add to database
-                    self.add_to_posted({
+                    await self.add_to_posted_async({
                         'comic_id': data['num'],
                         'title': title,
                         'alt_text': data['alt'],
@@ -69,16 +70,17 @@ class XkcdScraper(BaseScraper):
                     numberposted += 1
                     
                     # Log success
-                    self.log_success(numberposted)
+                    await self.log_success_async(numberposted)
             else:
-                self.log_error("JSON data missing required fields")
+                await self.log_error_async("JSON data missing required fields")
                 
         except Exception as e:
-            self.log_error(f"Error parsing JSON - {str(e)}")
+            await self.log_error_async(f"Error parsing JSON - {str(e)}")
         
         return numberposted
 
 # Testing code - will only run if this file is executed directly
 if __name__ == "__main__":
     scraper = XkcdScraper()
-    scraper.check_for_updates() 
\ No newline at end of file
+    scraper.check_for_updates()
+    scraper.finish() 
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Asyncio counterparts of the HTTP, database and Telegram helpers
+
+Used by scrapers written as coroutines (see rsr.scrapers.async_base) and by
+the asyncio runner (rsr.async_main). Page requests use aiohttp when it is
+installed, so hundreds of fetches can be in flight on one thread; without
+it they run through handleRequest in worker threads. MongoDB and Telegram
+calls always run in worker threads: pymongo is synchronous, and Telegram
+traffic has to go through the rate-limited dispatcher of
+rsr.utils.telegram.
+"""
+import json
+import asyncio
+import weakref
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from rsr.config import botapi, adminchat
+from rsr.utils import metrics
+from rsr.utils.http import handleRequest, get_conditional_headers
+from rsr.utils.httpcache import get_cache
+from rsr.utils.session import get_session, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from rsr.utils.settings import get_setting
+from rsr.utils.telegram import send_message as _send_message
+
+# Used when the async_http_connections setting is not configured
+DEFAULT_HTTP_CONNECTIONS = 100
+
+# One aiohttp session per event loop (sessions cannot be shared between loops)
+_sessions = weakref.WeakKeyDictionary()
+
+class AsyncResponse:
+    """
+    Fully read aiohttp response with the parts of requests.Response that
+    the scrapers use (status_code, ok, headers, content, text, json(),
+    iter_content(), close())
+    """
+
+    def __init__(self, url, status_code, headers, content, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+
+    @property
+    def ok(self):
+        """bool: True for status codes below 400"""
+        return self.status_code < 400
+
+    def __bool__(self):
+        return self.ok
+    
+    @property
+    def text(self):
+        """str: The body decoded with the response's charset"""
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        """
+        Decode the body as JSON
+
+        Returns:
+            The decoded JSON value
+        """
+        return json.loads(self.content)
+    
+    def iter_content(self, chunk_size=1):
+        """
+        Iterate over the body in chunks, for parsers that read incrementally
+        (e.g. rsr.utils.parsers.iterfeed)
+        
+        Args:
+            chunk_size (int): Bytes per chunk
+        
+        Yields:
+            bytes: The next chunk of the body
+        """
+        chunk_size = chunk_size or len(self.content) or 1
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+    
+    def close(self):
+        """Nothing to release, the body was read in full"""
+
+def use_aiohttp():
+    """
+    Check whether page requests go through aiohttp
+
+    Returns:
+        bool: True when aiohttp is installed and the async_aiohttp setting
+            is not turned off
+    """
+    return aiohttp is not None and get_setting('async_aiohttp', True)
+
+def _get_client():
+    loop = asyncio.get_running_loop()
+    client = _sessions.get(loop)
+    if client is None or client.closed:
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=get_setting('http_connect_timeout', DEFAULT_CONNECT_TIMEOUT),
+            sock_read=get_setting('http_read_timeout', DEFAULT_READ_TIMEOUT)
+        )
+        connector = aiohttp.TCPConnector(limit=get_setting('async_http_connections', DEFAULT_HTTP_CONNECTIONS))
+        # Same default headers (User-Agent) as the shared requests session
+        client = aiohttp.ClientSession(timeout=timeout, connector=connector, headers=dict(get_session().headers))
+        _sessions[loop] = client
+    return client
+
+async def close_client():
+    """
+    Close the aiohttp session of the running event loop, if any
+
+    Call before the loop ends (run() does so).
+    """
+    client = _sessions.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+def run(coroutine):
+    """
+    Run a coroutine in a new event loop, like asyncio.run
+
+    The loop's aiohttp session is closed before the loop ends.
+
+    Args:
+        coroutine: The coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    async def wrapper():
+        try:
+            return await coroutine
+        finally:
+            await close_client()
+    return asyncio.run(wrapper())
+
+async def offload(func, *args, **kwargs):
+    """
+    Run a blocking function in a worker thread
+
+    The metrics report of the calling task goes along, so database and
+    Telegram time is still counted for the scraper.
+
+    Args:
+        func: The function to call
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+
+    Returns:
+        The function's result
+    """
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+async def handle_request(url, conditional=False, cache=False, cache_ttl=None):
+    """
+    Make an HTTP request with error handling, without blocking the loop
+
+    Args:
+        url (str): URL to request
+        conditional (bool): Send the validators saved for this URL
+        cache (bool): Use the on-disk HTTP cache
+        cache_ttl (int, optional): Seconds to keep the response cached
+
+    Returns:
+        dict: Same as rsr.utils.http.handleRequest; 'request' is an
+            AsyncResponse when aiohttp is used
+    """
+    if not use_aiohttp():
+        return await offload(handleRequest, url, conditional, cache, cache_ttl)
+
+    try:
+        if cache:
+            with metrics.stage('http_cache'):
+                request = get_cache().get(url)
+            if request is not None:
+                return {"timeout": False, "request": request, "not_modified": False}
+
+        headers = get_conditional_headers(url) if conditional else None
+        with metrics.stage('http'):
+            async with _get_client().get(url, headers=headers) as response:
+                content = await response.read()
+                request = AsyncResponse(str(response.url), response.status, response.headers,
+                                        content, response.charset)
+            metrics.add_bytes('http', len(content))
+        not_modified = conditional and request.status_code == 304
+        if cache:
+            get_cache().set(url, request, cache_ttl)
+        return {"timeout": False, "request": request, "not_modified": not_modified}
+    except Exception as e:
+        await send_message(adminchat, f"Request error for {url}: {str(e) or type(e).__name__}")
+        return {"timeout": True, "request": "", "not_modified": False}
+
+async def send_message(chat, message, params=""):
+    """
+    Send a text message through the Telegram dispatcher
+
+    Args:
+        chat (str): Chat ID
+        message (str): Message text
+        params (str): Extra query parameters (see rsr.utils.telegram.send_message)
+    """
+    return await offload(_send_message, botapi, chat, message, params)
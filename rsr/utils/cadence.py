@@ -0,0 +1,107 @@
+"""
+Update cadence estimation for adaptive polling
+
+Every posted comic is stored with the time it was posted, so the history
+of a collection tells how often a comic updates and at which hours of the
+day. The daemon uses that to poll active comics often and quiet ones rarely.
+"""
+from datetime import datetime
+from statistics import median
+
+# Defaults used when the adaptive_* settings are not configured
+DEFAULT_MIN_INTERVAL = 300
+DEFAULT_MAX_INTERVAL = 6 * 3600
+DEFAULT_POLLS_PER_UPDATE = 48
+DEFAULT_HISTORY_SIZE = 50
+
+# Minimum number of posts before the history is trusted
+MIN_HISTORY = 3
+
+def load_post_times(collection, limit=DEFAULT_HISTORY_SIZE):
+    """
+    Load the most recent posting times of a collection
+
+    Some scrapers store the comic's own date string in 'date' and the
+    posting time in 'posted_date', so whichever field is a datetime is used.
+
+    Args:
+        collection: pymongo collection of posted comics
+        limit (int): Maximum number of recent posts to load
+
+    Returns:
+        list: Posting times as datetimes, oldest first
+    """
+    cursor = collection.find({}, {'date': 1, 'posted_date': 1, '_id': 0}).sort('_id', -1).limit(limit)
+    times = []
+    for doc in cursor:
+        for field in ('date', 'posted_date'):
+            if isinstance(doc.get(field), datetime):
+                times.append(doc[field])
+                break
+    return sorted(times)
+
+def estimate_cadence(times):
+    """
+    Estimate how often and when a comic updates
+
+    Args:
+        times (list): Posting times, oldest first
+
+    Returns:
+        dict or None: 'median_gap' in seconds, 'active_hours' (set of hours
+            of the day with regular posts) and 'last_post', or None when
+            there is not enough history
+    """
+    if len(times) < MIN_HISTORY:
+        return None
+
+    gaps = [(b - a).total_seconds() for a, b in zip(times, times[1:])]
+    gaps = [gap for gap in gaps if gap > 0]
+    if not gaps:
+        return None
+
+    # An hour counts as active when it (with its neighbours) saw a fair
+    # share of the posts
+    counts = [0] * 24
+    for t in times:
+        counts[t.hour] += 1
+    threshold = max(2, len(times) * 0.15)
+    active_hours = {
+        hour for hour in range(24)
+        if counts[hour] + counts[(hour - 1) % 24] + counts[(hour + 1) % 24] >= threshold
+    }
+
+    return {
+        'median_gap': median(gaps),
+        'active_hours': active_hours,
+        'last_post': times[-1]
+    }
+
+def adaptive_interval(cadence, now=None, min_interval=DEFAULT_MIN_INTERVAL,
+                      max_interval=DEFAULT_MAX_INTERVAL, polls_per_update=DEFAULT_POLLS_PER_UPDATE):
+    """
+    Choose a polling interval from a comic's cadence
+
+    The base interval is the typical gap between updates divided by
+    polls_per_update. It is halved during the comic's usual posting hours
+    and again once an update is overdue, then clamped to the bounds.
+
+    Args:
+        cadence (dict): Result of estimate_cadence
+        now (datetime, optional): Current time
+        min_interval (float): Shortest allowed interval in seconds
+        max_interval (float): Longest allowed interval in seconds
+        polls_per_update (float): Polls per typical gap between updates
+
+    Returns:
+        float: Polling interval in seconds
+    """
+    now = now or datetime.now()
+    interval = cadence['median_gap'] / polls_per_update
+
+    if now.hour in cadence['active_hours']:
+        interval /= 2
+    if (now - cadence['last_post']).total_seconds() > cadence['median_gap']:
+        interval /= 2
+
+    return min(max(interval, min_interval), max_interval)
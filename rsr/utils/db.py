@@ -1,8 +1,91 @@
 """
 Database utilities for MongoDB
 """
-from pymongo import MongoClient
+import threading
+
+from pymongo import MongoClient, ASCENDING
+from pymongo.errors import OperationFailure
 from rsr.config import mongodb_host, mongodb_port, mongodb_db
+from rsr.utils.settings import get_setting
+
+# Defaults used when the mongodb_*_pool_size settings are not configured
+DEFAULT_MAX_POOL_SIZE = 50
+DEFAULT_MIN_POOL_SIZE = 0
+
+# One client per (host, port) for the whole process
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(host=None, port=None):
+    """
+    Get the shared MongoDB client for a server
+    
+    MongoClient is thread-safe and keeps its own connection pool, so a
+    single instance is reused by every scraper and tool in the process.
+    
+    Args:
+        host (str, optional): MongoDB host (defaults to mongodb_host)
+        port (int, optional): MongoDB port (defaults to mongodb_port)
+    
+    Returns:
+        pymongo.MongoClient: The shared client
+    """
+    key = (host or mongodb_host, port or mongodb_port)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = MongoClient(
+                    key[0],
+                    key[1],
+                    maxPoolSize=get_setting('mongodb_max_pool_size', DEFAULT_MAX_POOL_SIZE),
+                    minPoolSize=get_setting('mongodb_min_pool_size', DEFAULT_MIN_POOL_SIZE)
+                )
+                _clients[key] = client
+    return client
+
+def close_clients():
+    """
+    Close all shared clients
+    
+    The next call to get_client creates a new client.
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+def ensure_indexes(collection, id_field):
+    """
+    Make sure a comic collection has the indexes its lookups need
+    
+    Creates a unique index on the identifier field (sparse, so documents
+    without it are allowed) and an index on 'date'. If the collection
+    already holds duplicate identifiers, a non-unique index is created
+    instead. Existing indexes on the same field are kept as they are.
+    
+    Args:
+        collection (pymongo.collection.Collection): The comic collection
+        id_field (str): Field identifying a comic
+    
+    Returns:
+        list: Warnings about indexes that could not be made unique
+    """
+    warnings = []
+    existing = [info['key'] for info in collection.index_information().values()]
+    
+    if [(id_field, ASCENDING)] not in existing:
+        try:
+            collection.create_index(id_field, unique=True, sparse=True)
+        except OperationFailure as e:
+            collection.create_index(id_field)
+            warnings.append(f"'{id_field}' index on '{collection.name}' is not unique: {str(e)}")
+    
+    if [('date', ASCENDING)] not in existing:
+        collection.create_index('date')
+    
+    return warnings
 
 def get_db_connection():
     """
@@ -11,8 +94,7 @@ def get_db_connection():
     Returns:
         pymongo.database.Database: MongoDB database instance
     """
-    client = MongoClient(mongodb_host, mongodb_port)
-    return client[mongodb_db]
+    return get_client()[mongodb_db]
 
 def get_collection(collection_name):
     """
@@ -0,0 +1,195 @@
+"""
+Fingerprints of posted images
+
+Some sites serve the same artwork under several URLs (CDN query strings,
+size suffixes), so a scraper that identifies comics by image URL would post
+it again. Every image posted by a scraper that opts in is fingerprinted and
+stored in MongoDB; a new image whose fingerprint is already known is skipped
+before it is downloaded in full or sent to Telegram.
+
+A fingerprint is a hash of the first bytes of the image (fetched with a
+Range request) plus its total size, and, when Pillow is installed and the
+image is small enough, a perceptual hash that also matches resized copies.
+The whole image is only downloaded for the perceptual hash, after the
+exact match has failed.
+"""
+import re
+import hashlib
+import threading
+from datetime import datetime
+from io import BytesIO
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from rsr.utils import metrics
+from rsr.utils.db import get_collection
+from rsr.utils.session import get_session
+from rsr.utils.settings import get_setting
+from rsr.utils.telegram import IMAGE_HEADERS
+
+# Defaults used when the fingerprint_* settings are not configured
+DEFAULT_PREFIX_BYTES = 64 * 1024
+DEFAULT_PERCEPTUAL_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_PERCEPTUAL_DISTANCE = 6
+
+# MongoDB collection shared by all scrapers
+COLLECTION_NAME = 'image_fingerprints'
+
+_CONTENT_RANGE_PATTERN = re.compile(r'bytes \d+-\d+/(\d+)')
+
+_indexed = False
+_indexed_lock = threading.Lock()
+
+def _get_collection():
+    global _indexed
+    collection = get_collection(COLLECTION_NAME)
+    if not _indexed:
+        with _indexed_lock:
+            if not _indexed:
+                collection.create_index([('scraper', 1), ('prefix_hash', 1), ('size', 1)])
+                _indexed = True
+    return collection
+
+def perceptual_hash(data):
+    """
+    Compute a 64-bit difference hash of an image
+
+    Resized or recompressed copies of an image get the same or a very
+    close hash.
+
+    Args:
+        data (bytes): The encoded image
+
+    Returns:
+        str or None: Hash as 16 hex digits, or None without Pillow or if
+            the image cannot be decoded
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(BytesIO(data)) as image:
+            pixels = list(image.convert('L').resize((9, 8)).getdata())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+def _distance(hash_a, hash_b):
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+def fingerprint(url):
+    """
+    Fingerprint an image from a partial download
+
+    Only the first fingerprint_prefix_bytes are requested. The perceptual
+    hash is left for find_duplicate, which only downloads the whole image
+    when the cheap exact match fails.
+
+    Args:
+        url (str): URL of the image
+
+    Returns:
+        dict or None: 'prefix_hash', 'size' and 'phash' (None unless the
+            whole image fit in the prefix), or None if the image could not
+            be fetched
+    """
+    prefix_bytes = get_setting('fingerprint_prefix_bytes', DEFAULT_PREFIX_BYTES)
+
+    headers = dict(IMAGE_HEADERS, Range=f"bytes=0-{prefix_bytes - 1}")
+    with metrics.stage('image_download'):
+        response = get_session().get(url, headers=headers, stream=True)
+        try:
+            if response.status_code == 206:
+                match = _CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+                size = int(match.group(1)) if match else None
+            elif response.status_code == 200:
+                # The server ignored the Range header
+                size = response.headers.get('Content-Length')
+                size = int(size) if size and size.isdigit() else None
+            else:
+                return None
+
+            data = bytearray()
+            for chunk in response.iter_content(chunk_size=16 * 1024):
+                data += chunk
+                if len(data) >= prefix_bytes:
+                    break
+            prefix = bytes(data[:prefix_bytes])
+            if size is None and len(data) < prefix_bytes:
+                size = len(data)
+        finally:
+            response.close()
+    metrics.add_bytes('image_download', len(prefix))
+
+    return {
+        'prefix_hash': hashlib.sha256(prefix).hexdigest(),
+        'size': size,
+        'phash': perceptual_hash(prefix) if size is not None and size <= len(prefix) else None
+    }
+
+def _add_perceptual_hash(url, fp):
+    """
+    Download a small image in full and add its perceptual hash to fp
+
+    Skipped without Pillow and for images over fingerprint_perceptual_max_bytes.
+    """
+    perceptual_max = get_setting('fingerprint_perceptual_max_bytes', DEFAULT_PERCEPTUAL_MAX_BYTES)
+    if fp.get('phash') or Image is None or fp['size'] is None or fp['size'] > perceptual_max:
+        return
+    with metrics.stage('image_download'):
+        response = get_session().get(url, headers=IMAGE_HEADERS)
+    if response.status_code == 200:
+        metrics.add_bytes('image_download', len(response.content))
+        fp['phash'] = perceptual_hash(response.content)
+
+def find_duplicate(scraper, fp, url=None):
+    """
+    Find an image a scraper already posted with the same fingerprint
+
+    The exact prefix/size match is checked first. Only when it fails, and
+    url is given, is the image downloaded for its perceptual hash (stored
+    in fp, so remember() keeps it).
+
+    Args:
+        scraper (str): Collection name of the scraper
+        fp (dict): Fingerprint from fingerprint()
+        url (str, optional): URL of the image, to compute the perceptual hash
+
+    Returns:
+        dict or None: The stored fingerprint document of the earlier image
+    """
+    collection = _get_collection()
+    with metrics.stage('db'):
+        match = collection.find_one({'scraper': scraper, 'prefix_hash': fp['prefix_hash'], 'size': fp['size']})
+    if match:
+        return match
+
+    if url is not None:
+        _add_perceptual_hash(url, fp)
+    if not fp.get('phash'):
+        return None
+
+    max_distance = get_setting('fingerprint_perceptual_distance', DEFAULT_PERCEPTUAL_DISTANCE)
+    with metrics.stage('db'):
+        for document in collection.find({'scraper': scraper, 'phash': {'$ne': None}}, {'phash': 1, 'image_url': 1}):
+            if _distance(fp['phash'], document['phash']) <= max_distance:
+                return document
+    return None
+
+def remember(scraper, image_url, fp):
+    """
+    Store the fingerprint of a posted image
+
+    Args:
+        scraper (str): Collection name of the scraper
+        image_url (str): URL the image was posted from
+        fp (dict): Fingerprint from fingerprint()
+    """
+    with metrics.stage('db'):
+        _get_collection().insert_one(dict(fp, scraper=scraper, image_url=image_url, date=datetime.now()))
@@ -1,26 +1,68 @@
 """
 HTTP request handling utilities
 """
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
 from rsr.config import reddit_user, botapi, adminchat
+from rsr.utils import metrics
+from rsr.utils.httpcache import get_cache
+from rsr.utils.session import get_session
+from rsr.utils.settings import get_setting
+from rsr.utils.store import JsonStore
 from rsr.utils.telegram import send_message
 
-def handleRequest(url):
+# Used when the probe_workers setting is not configured
+DEFAULT_PROBE_WORKERS = 12
+
+# ETag / Last-Modified validators from the last processed response, per URL
+_validators = JsonStore('http_validators')
+
+# URL template that matched last time, per probe_templates name
+_probe_winners = JsonStore('probe_winners')
+
+def handleRequest(url, conditional=False, cache=False, cache_ttl=None, stream=False):
     """
     Make an HTTP request with error handling
     
+    With stream, only the headers are read here and the body is left for an
+    incremental reader such as rsr.utils.parsers.iterfeed, which closes the
+    response. Cached responses are always read in full, so stream has no
+    effect together with cache.
+    
     Args:
         url (str): URL to request
+        conditional (bool): Send If-None-Match/If-Modified-Since using the
+            validators saved for this URL (see save_validators)
+        cache (bool): Serve the response from the on-disk cache when a
+            fresh copy is there, and store it otherwise (see rsr.utils.httpcache)
+        cache_ttl (int, optional): Seconds to keep the response cached,
+            overriding its Cache-Control/Expires headers
+        stream (bool): Do not download the body yet
         
     Returns:
-        dict: Dictionary with 'timeout' flag and 'request' object
+        dict: Dictionary with 'timeout' flag, 'request' object and
+            'not_modified' flag (True when the server answered 304)
     """
     try:
-        request = requests.get(url)
-        return {"timeout": False, "request": request}
+        if cache:
+            with metrics.stage('http_cache'):
+                request = get_cache().get(url)
+            if request is not None:
+                return {"timeout": False, "request": request, "not_modified": False}
+        
+        headers = get_conditional_headers(url) if conditional else None
+        stream = stream and not cache
+        with metrics.stage('http'):
+            request = get_session().get(url, headers=headers, stream=stream)
+            if not stream:
+                metrics.add_bytes('http', len(request.content))
+        not_modified = conditional and request.status_code == 304
+        if cache:
+            get_cache().set(url, request, cache_ttl)
+        return {"timeout": False, "request": request, "not_modified": not_modified}
     except Exception as e:
         send_message(botapi, adminchat, f"Request error for {url}: {str(e)}")
-        return {"timeout": True, "request": ""}
+        return {"timeout": True, "request": "", "not_modified": False}
 
 def handleRedditRequest(url):
     """
@@ -33,8 +75,136 @@ def handleRedditRequest(url):
         dict: Dictionary with 'timeout' flag and 'request' object
     """
     try:
-        request = requests.get(url, headers={'User-agent': f'{reddit_user}'})
-        return {'timeout': False, 'request': request}
+        with metrics.stage('http'):
+            request = get_session().get(url, headers={'User-agent': f'{reddit_user}'})
+            metrics.add_bytes('http', len(request.content))
+        return {'timeout': False, 'request': request, 'not_modified': False}
     except Exception as e:
         send_message(botapi, adminchat, f"Reddit request error for {url}: {str(e)}")
-        return {"timeout": True, 'request': ""} 
\ No newline at end of file
+        return {"timeout": True, 'request': "", 'not_modified': False}
+
+def get_conditional_headers(url):
+    """
+    Build conditional request headers from the saved validators
+    
+    Args:
+        url (str): URL that is about to be requested
+    
+    Returns:
+        dict: If-None-Match / If-Modified-Since headers (may be empty)
+    """
+    validators = _validators.get(url) or {}
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+def save_validators(url, response):
+    """
+    Save the ETag / Last-Modified validators of a response
+    
+    Only call this once the response has been fully processed, otherwise a
+    failed run would get a 304 next time and never see the content again.
+    
+    Args:
+        url (str): URL that was requested
+        response: HTTP response object with headers
+    """
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        _validators.set(url, {'etag': etag, 'last_modified': last_modified})
+    else:
+        _validators.delete(url)
+
+def _url_exists(url):
+    """
+    Check whether a URL answers with a 2xx status, without downloading it
+    
+    Servers that do not support HEAD get a streamed GET that is closed
+    before the body is read.
+    
+    Args:
+        url (str): URL to check
+    
+    Returns:
+        bool: True on a 2xx response
+    """
+    try:
+        with metrics.stage('http'):
+            response = get_session().head(url, allow_redirects=True)
+            if response.status_code in (405, 501):
+                response = get_session().get(url, stream=True)
+                response.close()
+        return 200 <= response.status_code < 300
+    except Exception:
+        return False
+
+def probe_urls(urls):
+    """
+    Find the first existing URL of a list, checking them all concurrently
+    
+    Every URL is checked at once, but the result respects the order of
+    the list: a URL is only returned once all URLs before it have failed.
+    
+    Args:
+        urls (list): Candidate URLs, most likely first
+    
+    Returns:
+        str or None: The first URL that exists
+    """
+    if not urls:
+        return None
+    
+    # Helper threads report their timings to the caller's run report
+    report = metrics.current_report()
+    
+    def check(url):
+        with metrics.bind(report):
+            return _url_exists(url)
+    
+    workers = max(1, min(get_setting('probe_workers', DEFAULT_PROBE_WORKERS), len(urls)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="probe")
+    try:
+        futures = [executor.submit(check, url) for url in urls]
+        for url, future in zip(urls, futures):
+            if future.result():
+                return url
+        return None
+    finally:
+        # Don't wait for the checks of less likely URLs
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+def probe_templates(name, templates, **values):
+    """
+    Find an existing URL among URL templates, learning which one usually wins
+    
+    The template that matched last time is checked on its own first, which
+    costs a single HEAD request once a site's layout has been learned. If it
+    fails, all templates are probed concurrently and the winner is saved.
+    
+    Args:
+        name (str): Key under which the winning template is remembered
+        templates (list): URL templates (str.format syntax), most likely first
+        **values: Values substituted into the templates
+    
+    Returns:
+        str or None: The first URL that exists
+    """
+    winner = _probe_winners.get(name)
+    if winner in templates:
+        url = winner.format(**values)
+        if _url_exists(url):
+            return url
+    
+    urls = [template.format(**values) for template in templates]
+    url = probe_urls(urls)
+    if url is not None:
+        template = templates[urls.index(url)]
+        if template != winner:
+            _probe_winners.set(name, template)
+    return url
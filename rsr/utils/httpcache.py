@@ -0,0 +1,222 @@
+"""
+On-disk cache of HTTP responses
+
+Pages that never change once published (e.g. a comic's permalink) can be
+kept on disk, so a later run that needs the page again reads it from the
+cache instead of the network. Entries expire according to the response's
+Cache-Control / Expires headers, or a TTL given by the caller. The cache is
+bounded in size; the least recently used entries are evicted first.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from rsr.utils.settings import get_setting
+from rsr.utils.store import get_state_dir
+
+# Used when the http_cache_max_bytes setting is not configured
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+_MAX_AGE_PATTERN = re.compile(r'max-age\s*=\s*"?(\d+)"?')
+
+def freshness_lifetime(headers):
+    """
+    Get how long a response may be served from a cache
+
+    Args:
+        headers: Response headers
+
+    Returns:
+        int or None: Lifetime in seconds (0 when it must not be reused
+            without revalidation), None if the headers do not say
+    """
+    cache_control = headers.get('Cache-Control', '').lower()
+    if 'no-cache' in cache_control:
+        return 0
+    match = _MAX_AGE_PATTERN.search(cache_control)
+    if match:
+        return int(match.group(1))
+    if headers.get('Expires'):
+        try:
+            expires = parsedate_to_datetime(headers['Expires']).timestamp()
+        except (TypeError, ValueError):
+            return 0
+        return max(0, int(expires - time.time()))
+    return None
+
+class ResponseCache:
+    """
+    Size-bounded directory of cached responses
+
+    Each entry is a body file plus a small JSON file with the status,
+    headers and expiry time. The modification time of the body file is
+    refreshed on every hit and serves as the LRU order.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache
+
+        Args:
+            directory (str): Directory holding the entries (created if needed)
+            max_bytes (int): Total size of the bodies kept at most
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+
+    def get(self, url):
+        """
+        Get a fresh cached response
+
+        Args:
+            url (str): URL of the response
+
+        Returns:
+            requests.Response or None: The cached response, or None if
+                there is no fresh entry
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta['url'] != url:
+                return None
+            if meta['expires'] <= time.time():
+                self._remove(meta_path, body_path)
+                return None
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            # Mark as recently used
+            os.utime(body_path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.headers.update(meta['headers'])
+        response.url = url
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def set(self, url, response, ttl=None):
+        """
+        Store a response if it may be cached
+
+        Only 200 responses are stored, and never with Cache-Control:
+        no-store. The lifetime comes from ttl when given, otherwise from
+        the response headers.
+
+        Args:
+            url (str): URL that was requested
+            response (requests.Response): The response
+            ttl (int, optional): Lifetime in seconds, overriding the headers
+
+        Returns:
+            bool: True if the response was stored
+        """
+        if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', '').lower():
+            return False
+        lifetime = ttl if ttl is not None else freshness_lifetime(response.headers)
+        if not lifetime or lifetime <= 0:
+            return False
+
+        # A limit of 0 disables the cache
+        body = response.content
+        if not self.max_bytes or len(body) > self.max_bytes:
+            return False
+
+        # The body is stored decoded, so drop the headers describing the transfer
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')}
+        meta = {'url': url, 'status': response.status_code, 'headers': headers, 'expires': time.time() + lifetime}
+
+        meta_path, body_path = self._paths(url)
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+                self._write(body_path, body)
+                self._write(meta_path, json.dumps(meta).encode('utf-8'))
+            except OSError as e:
+                print(f"Error caching {url}: {str(e)}")
+                return False
+            if self._size is not None:
+                self._size += len(body) - old_size
+            self._evict()
+        return True
+
+    def _write(self, path, data):
+        # Write atomically so that readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _remove(self, meta_path, body_path):
+        with self._lock:
+            for path in (meta_path, body_path):
+                try:
+                    size = os.path.getsize(path) if path == body_path else 0
+                    os.remove(path)
+                    if self._size is not None:
+                        self._size -= size
+                except OSError:
+                    pass
+
+    def _evict(self):
+        # Called with the lock held
+        bodies = []
+        if self._size is None or self._size > self.max_bytes:
+            for name in os.listdir(self.directory):
+                if name.endswith('.body'):
+                    stat = os.stat(os.path.join(self.directory, name))
+                    bodies.append((stat.st_mtime, stat.st_size, name[:-5]))
+            self._size = sum(size for _, size, _ in bodies)
+
+        # Drop the least recently used entries until the cache fits
+        for _, size, key in sorted(bodies):
+            if self._size <= self.max_bytes:
+                break
+            for extension in ('.json', '.body'):
+                try:
+                    os.remove(os.path.join(self.directory, key + extension))
+                except OSError:
+                    pass
+            self._size -= size
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """
+    Get the shared response cache, configured by the http_cache_* settings
+
+    Returns:
+        ResponseCache: The cache
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            directory = get_setting('http_cache_dir') or os.path.join(get_state_dir(), 'http_cache')
+            _cache = ResponseCache(directory, get_setting('http_cache_max_bytes', DEFAULT_MAX_BYTES))
+        return _cache
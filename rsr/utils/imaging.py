@@ -0,0 +1,254 @@
+"""
+Image normalization before upload
+
+Telegram rejects photos over 10 MB, with width + height over 10000 pixels or
+with an aspect ratio over 20, and does not reliably show WebP as a photo.
+normalize() converts such images to JPEG, downscales them and slices very
+tall or wide strips into panels that can be posted as an album.
+
+Decoding and re-encoding is CPU-bound, so it runs in a process pool instead
+of blocking the scraper threads. Results are cached on disk by the hash of
+the source image. Pillow is optional: without it images are uploaded as
+they are.
+"""
+import os
+import io
+import math
+import shutil
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from rsr.utils import metrics
+from rsr.utils.settings import get_setting
+from rsr.utils.store import get_state_dir
+
+# Defaults used when the image_* settings are not configured
+DEFAULT_IMAGE_WORKERS = 2
+DEFAULT_MAX_WIDTH = 2560
+DEFAULT_SLICE_ASPECT = 20
+DEFAULT_CACHE_ENTRIES = 200
+
+# Telegram's limits for photos
+PHOTO_MAX_BYTES = 10 * 1024 * 1024
+PHOTO_MAX_SIDE_SUM = 10000
+PHOTO_MAX_ASPECT = 20
+
+# JPEG qualities tried in turn until the image fits PHOTO_MAX_BYTES
+JPEG_QUALITIES = (90, 80, 70, 60)
+
+_executor = None
+_executor_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+def _encode(image):
+    """Encode an image as JPEG, lowering the quality until it fits"""
+    for quality in JPEG_QUALITIES:
+        output = io.BytesIO()
+        image.save(output, 'JPEG', quality=quality, optimize=True)
+        if output.tell() <= PHOTO_MAX_BYTES:
+            break
+    return output.getvalue()
+
+def _normalize(data, max_width, slice_aspect, allow_slices):
+    """
+    Make an image acceptable as a Telegram photo (runs in a worker process)
+
+    Args:
+        data (bytes): The encoded source image
+        max_width (int): Images wider than this are downscaled
+        slice_aspect (float): Strips taller or wider than this many times
+            their other side are sliced (at most PHOTO_MAX_ASPECT)
+        allow_slices (bool): False to only downscale (e.g. inside an album)
+
+    Returns:
+        list or None: JPEG panels, top to bottom, None if the image can be
+            uploaded unchanged (or cannot be decoded), or an empty list if
+            it is too tall or wide for one photo and allow_slices is False
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        source_format = image.format
+        width, height = image.size
+    except Exception:
+        return None
+
+    slice_aspect = min(slice_aspect, PHOTO_MAX_ASPECT)
+    too_big = len(data) > PHOTO_MAX_BYTES
+    tall = height > width * slice_aspect
+    wide = width > height * slice_aspect
+    bad_dimensions = width + height > PHOTO_MAX_SIDE_SUM or tall or wide
+    if source_format in ('JPEG', 'PNG') and not too_big and not bad_dimensions and width <= max_width:
+        return None
+
+    # Animated images keep their first frame; transparency goes on white
+    image.seek(0)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    else:
+        image = image.convert('RGB')
+
+    if width > max_width:
+        height = max(1, round(height * max_width / width))
+        width = max_width
+        image = image.resize((width, height), Image.LANCZOS)
+
+    # The aspect ratio survives the downscale above
+    if allow_slices and (tall or wide):
+        # Keep panels well above 1 / PHOTO_MAX_ASPECT of the short side even
+        # when the side sum is what limits them
+        short_side = width if tall else height
+        if short_side > PHOTO_MAX_SIDE_SUM // 2:
+            scale = (PHOTO_MAX_SIDE_SUM // 2) / short_side
+            width, height = max(1, round(width * scale)), max(1, round(height * scale))
+            image = image.resize((width, height), Image.LANCZOS)
+        short_side, long_side = (width, height) if tall else (height, width)
+
+        # Split the long side into equal panels (top to bottom, or left to
+        # right), each within the aspect ratio and side sum
+        max_panel = max(1, min(int(short_side * slice_aspect), PHOTO_MAX_SIDE_SUM - short_side))
+        count = math.ceil(long_side / max_panel)
+        bounds = [round(long_side * number / count) for number in range(count + 1)]
+        if tall:
+            boxes = [(0, start, width, end) for start, end in zip(bounds, bounds[1:])]
+        else:
+            boxes = [(start, 0, end, height) for start, end in zip(bounds, bounds[1:])]
+        return [_encode(image.crop(box)) for box in boxes]
+
+    if height > width * PHOTO_MAX_ASPECT or width > height * PHOTO_MAX_ASPECT:
+        # Downscaling keeps the aspect ratio, so Telegram would still reject it
+        return []
+
+    if width + height > PHOTO_MAX_SIDE_SUM:
+        # Shrink the whole image until it fits in a single photo
+        scale = PHOTO_MAX_SIDE_SUM / (width + height)
+        width, height = max(1, int(width * scale)), max(1, int(height * scale))
+        image = image.resize((width, height), Image.LANCZOS)
+
+    return [_encode(image)]
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned workers do not inherit the scraper threads' locks
+            _executor = ProcessPoolExecutor(
+                max_workers=get_setting('image_workers', DEFAULT_IMAGE_WORKERS),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+def _reset_executor():
+    # Start a fresh pool for the next image
+    global _executor
+    with _executor_lock:
+        _executor = None
+
+def _cache_dir():
+    return os.path.join(get_state_dir(), 'normalized_images')
+
+def _cache_get(key):
+    directory = os.path.join(_cache_dir(), key)
+    try:
+        names = sorted(os.listdir(directory))
+        panels = []
+        for name in names:
+            with open(os.path.join(directory, name), 'rb') as f:
+                panels.append(f.read())
+        # Mark as recently used
+        os.utime(directory)
+        return panels
+    except OSError:
+        return None
+
+def _cache_set(key, panels):
+    root = _cache_dir()
+    temp_dir = None
+    with _cache_lock:
+        try:
+            os.makedirs(root, exist_ok=True)
+            # Write into a temporary directory and rename it, so readers
+            # never see a partial entry
+            temp_dir = tempfile.mkdtemp(dir=root, prefix='.tmp_')
+            for number, panel in enumerate(panels):
+                with open(os.path.join(temp_dir, f"{number:03d}.jpg"), 'wb') as f:
+                    f.write(panel)
+            os.replace(temp_dir, os.path.join(root, key))
+        except OSError as e:
+            print(f"Error caching normalized image: {str(e)}")
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            return
+
+        # Drop the least recently used entries
+        limit = get_setting('image_cache_entries', DEFAULT_CACHE_ENTRIES)
+        entries = [os.path.join(root, name) for name in os.listdir(root) if not name.startswith('.')]
+        if len(entries) > limit:
+            entries.sort(key=os.path.getmtime)
+            for path in entries[:len(entries) - limit]:
+                shutil.rmtree(path, ignore_errors=True)
+
+def available():
+    """
+    Check whether images can be normalized
+
+    Returns:
+        bool: True when Pillow is installed
+    """
+    return Image is not None
+
+def normalize(data, allow_slices=True):
+    """
+    Convert, downscale and slice an image so Telegram accepts it as a photo
+
+    Args:
+        data (bytes): The encoded source image
+        allow_slices (bool): False to never split the image (for album items)
+
+    Returns:
+        list or None: JPEG panels, top to bottom, None if the image can be
+            uploaded as it is (also when Pillow is not installed), or an
+            empty list if it cannot be a photo without slicing
+    """
+    if Image is None:
+        return None
+
+    max_width = get_setting('image_max_width', DEFAULT_MAX_WIDTH)
+    slice_aspect = get_setting('image_slice_aspect', DEFAULT_SLICE_ASPECT)
+    digest = hashlib.sha256(data)
+    digest.update(f"{max_width}:{slice_aspect}:{allow_slices}".encode())
+    key = digest.hexdigest()
+
+    panels = _cache_get(key)
+    if panels is not None:
+        return panels or None
+
+    with metrics.stage('image_normalize'):
+        try:
+            panels = _get_executor().submit(_normalize, data, max_width, slice_aspect, allow_slices).result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed while decoding a huge image)
+            _reset_executor()
+            print(f"Error normalizing image: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"Error normalizing image: {str(e)}")
+            return None
+
+    if panels is None:
+        # An empty entry remembers that the image needs no changes
+        _cache_set(key, [])
+    elif panels:
+        _cache_set(key, panels)
+    return panels
@@ -0,0 +1,194 @@
+"""
+Per-stage timing instrumentation
+
+The runner opens a RunReport for every scraper run. While it is active,
+the HTTP, parsing, database and Telegram helpers record how long each
+stage took and how many bytes it moved. The reports are appended to a JSON
+lines file so slow sites and regressions can be found later.
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from rsr.utils.settings import get_setting
+from rsr.utils.store import get_state_dir
+
+# A context variable rather than a thread-local, so that scrapers running
+# as coroutines on one event loop each keep their own report
+_report = ContextVar('metrics_report', default=None)
+
+class RunReport:
+    """
+    Durations, call counts and byte counts per stage for one scraper run
+    """
+    
+    def __init__(self, scraper):
+        """
+        Initialize an empty report
+        
+        Args:
+            scraper (str): Name of the scraper being measured
+        """
+        self.scraper = scraper
+        self.stages = {}
+        self._lock = threading.Lock()
+    
+    def record(self, stage, seconds=0.0, nbytes=0, count=1):
+        """
+        Add a measurement to a stage
+        
+        Args:
+            stage (str): Stage name (e.g. 'http', 'parse', 'db', 'telegram')
+            seconds (float): Time spent
+            nbytes (int): Bytes transferred or processed
+            count (int): Number of operations
+        """
+        with self._lock:
+            totals = self.stages.setdefault(stage, {'seconds': 0.0, 'count': 0, 'bytes': 0})
+            totals['seconds'] += seconds
+            totals['count'] += count
+            totals['bytes'] += nbytes
+    
+    def to_dict(self):
+        """
+        Get the report as a JSON-serializable dict
+        
+        Returns:
+            dict: Stage name -> seconds/count/bytes
+        """
+        with self._lock:
+            return {
+                name: {'seconds': round(t['seconds'], 4), 'count': t['count'], 'bytes': t['bytes']}
+                for name, t in self.stages.items()
+            }
+
+def current_report():
+    """
+    Get the report of the scraper running in this thread (or task)
+    
+    Returns:
+        RunReport or None: The active report, if any
+    """
+    return _report.get()
+
+@contextmanager
+def collect(scraper):
+    """
+    Activate a new report for the current thread
+    
+    Args:
+        scraper (str): Name of the scraper being measured
+    
+    Yields:
+        RunReport: The active report
+    """
+    report = RunReport(scraper)
+    with bind(report):
+        yield report
+
+@contextmanager
+def bind(report):
+    """
+    Make an existing report active in the current thread
+    
+    Used by helper threads that work on behalf of a scraper.
+    
+    Args:
+        report (RunReport or None): Report to activate
+    """
+    token = _report.set(report)
+    try:
+        yield report
+    finally:
+        _report.reset(token)
+
+@contextmanager
+def stage(name, count=1):
+    """
+    Time a block of code as an operation of a stage
+    
+    Does nothing measurable when no report is active.
+    
+    Args:
+        name (str): Stage name
+        count (int): Operations to count (0 to add time to the previous one)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        report = current_report()
+        if report is not None:
+            report.record(name, time.perf_counter() - start, count=count)
+
+def add_bytes(name, nbytes):
+    """
+    Add a byte count to a stage without counting an extra operation
+    
+    Args:
+        name (str): Stage name
+        nbytes (int): Number of bytes
+    """
+    report = current_report()
+    if report is not None and nbytes:
+        report.record(name, nbytes=nbytes, count=0)
+
+def write_lines(records):
+    """
+    Append records to the metrics log as JSON lines
+    
+    Args:
+        records (list): JSON-serializable dicts
+    """
+    path = get_setting('metrics_log_path') or os.path.join(get_state_dir(), 'run_metrics.jsonl')
+    try:
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+    except OSError as e:
+        print(f"Error writing metrics: {str(e)}")
+
+def write_run_report(summary):
+    """
+    Write one line per scraper plus one line for the whole run
+    
+    Args:
+        summary (dict): Run summary returned by rsr.main.run_scrapers
+    """
+    run_id = summary['started']
+    records = [dict(result, type='scraper', run=run_id) for result in summary['results']]
+    records.append({
+        'type': 'run',
+        'run': run_id,
+        'duration': summary['duration'],
+        'workers': summary['workers'],
+        'posted': summary['posted'],
+        'failed': summary['failed']
+    })
+    write_lines(records)
+
+def format_report(summary, top=5):
+    """
+    Format the slowest scrapers of a run for the admin chat
+    
+    Args:
+        summary (dict): Run summary returned by rsr.main.run_scrapers
+        top (int): Number of scrapers to include
+    
+    Returns:
+        str: Plain text report
+    """
+    lines = [f"Run report {datetime.now().strftime('%Y-%m-%d %H:%M')}: {summary['duration']:.1f}s total"]
+    slowest = sorted(summary['results'], key=lambda r: r['duration'], reverse=True)[:top]
+    for result in slowest:
+        stages = result.get('stages', {})
+        parts = ", ".join(
+            f"{name} {t['seconds']:.1f}s/{t['bytes'] // 1024}KB"
+            for name, t in sorted(stages.items(), key=lambda item: item[1]['seconds'], reverse=True)
+        )
+        lines.append(f"{result['scraper']} {result['duration']:.1f}s ({parts})")
+    return "\n".join(lines)
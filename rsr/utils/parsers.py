@@ -1,23 +1,59 @@
 """
 HTML and XML parsing utilities
 """
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
+try:
+    from lxml.etree import XMLPullParser
+except ImportError:
+    from xml.etree.ElementTree import XMLPullParser
 from rsr.config import botapi, adminchat
+from rsr.utils import metrics
+from rsr.utils.settings import get_setting
 from rsr.utils.telegram import send_message
 
-def makesoup(request):
+# Used when the html_parser setting is not configured
+DEFAULT_HTML_PARSER = "lxml"
+
+def _parse_html(markup, parse_only=None):
+    """
+    Parse HTML with the configured parser, falling back to html.parser
+    
+    Args:
+        markup (str): HTML to parse
+        parse_only (SoupStrainer, optional): Only build these elements
+    
+    Returns:
+        BeautifulSoup: Parsed HTML
+    """
+    try:
+        return BeautifulSoup(markup, get_setting('html_parser', DEFAULT_HTML_PARSER), parse_only=parse_only)
+    except FeatureNotFound:
+        # lxml is not installed
+        return BeautifulSoup(markup, "html.parser", parse_only=parse_only)
+
+def makesoup(request, parse_only=None):
     """
     Create a BeautifulSoup object from an HTTP request
     
+    With parse_only, only the matching elements (and their contents) are
+    built, which is much cheaper on large pages. If nothing on the page
+    matches, the whole page is parsed so that a scraper's fallbacks for
+    a changed layout still see everything.
+    
     Args:
         request: HTTP request object with text attribute
+        parse_only (SoupStrainer, optional): Elements the caller looks at
         
     Returns:
         BeautifulSoup: Parsed HTML
     """
     try:
         if request and request.text:
-            soup = BeautifulSoup(request.text, "html.parser")
+            with metrics.stage('parse'):
+                soup = _parse_html(request.text, parse_only)
+                if parse_only is not None and soup.find() is None:
+                    soup = _parse_html(request.text)
+            metrics.add_bytes('parse', len(request.content))
             return soup
         else:
             send_message(botapi, adminchat, "Error: empty response in makesoup")
@@ -42,17 +78,123 @@ def makexmlsoup(request):
             import warnings
             warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
             
-            try:
-                # Use lxml explicitly for XML parsing
-                soup = BeautifulSoup(request.text, features="xml")
-            except Exception as parser_error:
-                send_message(botapi, adminchat, f"XML parser error, falling back to html.parser: {str(parser_error)}")
-                # Fallback to html.parser
-                soup = BeautifulSoup(request.text, "html.parser")
+            with metrics.stage('parse'):
+                try:
+                    # Use lxml explicitly for XML parsing
+                    soup = BeautifulSoup(request.text, features="xml")
+                except Exception as parser_error:
+                    send_message(botapi, adminchat, f"XML parser error, falling back to html.parser: {str(parser_error)}")
+                    # Fallback to html.parser
+                    soup = BeautifulSoup(request.text, "html.parser")
+            metrics.add_bytes('parse', len(request.content))
             return soup
         else:
             send_message(botapi, adminchat, "Error: empty response in makexmlsoup")
             return BeautifulSoup("", "html.parser")
     except Exception as e:
         send_message(botapi, adminchat, f"Error in makexmlsoup: {str(e)}")
-        return BeautifulSoup("", "html.parser") 
\ No newline at end of file
+        return BeautifulSoup("", "html.parser") 
+
+def _localname(tag):
+    """Strip the XML namespace from a tag name"""
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+def _child_text(elem, *names):
+    """Get the text of the first child with one of the given local names"""
+    for name in names:
+        for child in elem:
+            if _localname(child.tag) == name and child.text:
+                return child.text.strip()
+    return None
+
+def _feed_entry(elem):
+    """
+    Normalize an RSS <item> or Atom <entry> element
+    
+    Args:
+        elem: Parsed item/entry element
+    
+    Returns:
+        dict: Entry with 'title', 'link', 'guid', 'pubDate' and 'enclosures'
+    """
+    link = None
+    enclosures = []
+    for child in elem:
+        name = _localname(child.tag)
+        if name == 'link':
+            rel = child.get('rel', 'alternate')
+            if child.get('href') and rel == 'enclosure':
+                enclosures.append({'url': child.get('href'), 'type': child.get('type'), 'length': child.get('length')})
+            elif child.get('href') and rel == 'alternate' and link is None:
+                # Atom: <link rel="alternate" href="..."/>
+                link = child.get('href')
+            elif child.text and child.text.strip() and link is None:
+                # RSS: <link>...</link>
+                link = child.text.strip()
+        elif name in ('enclosure', 'content') and child.get('url'):
+            # RSS <enclosure> and Media RSS <media:content>
+            enclosures.append({'url': child.get('url'), 'type': child.get('type'), 'length': child.get('length')})
+    
+    return {
+        'title': _child_text(elem, 'title'),
+        'link': link,
+        'guid': _child_text(elem, 'guid', 'id') or link,
+        'pubDate': _child_text(elem, 'pubDate', 'published', 'updated'),
+        'enclosures': enclosures
+    }
+
+def iterfeed(request, stop_at=None, chunk_size=16 * 1024):
+    """
+    Lazily iterate over the entries of an RSS or Atom feed
+    
+    The feed is parsed incrementally and each entry is discarded once it
+    has been yielded, so only the entries the caller consumes are parsed
+    and kept in memory. Feeds list the newest entries first, so a caller
+    that stops at the first already posted entry never parses the rest.
+    
+    Memory only stays proportional to the entries read when the response
+    is streamed (handleRequest(..., stream=True)); otherwise the whole feed
+    was already downloaded. The response is closed when iteration ends, so
+    a streamed feed is not downloaded past the last entry read.
+    
+    Args:
+        request: HTTP response object of the feed
+        stop_at (callable, optional): Called with each entry; iteration
+            stops (without yielding it) when it returns True
+        chunk_size (int): Bytes fed to the parser at a time
+    
+    Yields:
+        dict: Entry with 'title', 'link', 'guid', 'pubDate' and 'enclosures'
+            (list of dicts with 'url', 'type' and 'length')
+    """
+    if not request:
+        send_message(botapi, adminchat, "Error: empty response in iterfeed")
+        return
+    
+    parser = XMLPullParser(events=('end',))
+    first = True
+    try:
+        for chunk in request.iter_content(chunk_size=chunk_size):
+            with metrics.stage('parse', count=1 if first else 0):
+                parser.feed(chunk)
+                events = list(parser.read_events())
+            metrics.add_bytes('parse', len(chunk))
+            first = False
+            
+            for _, elem in events:
+                if _localname(elem.tag) not in ('item', 'entry'):
+                    continue
+                entry = _feed_entry(elem)
+                # Free the entry, it is not needed anymore
+                elem.clear()
+                if stop_at is not None and stop_at(entry):
+                    return
+                yield entry
+        
+        # Report a truncated or malformed feed
+        parser.close()
+    except Exception as e:
+        send_message(botapi, adminchat, f"Error in iterfeed: {str(e)}")
+    finally:
+        # Stop downloading a streamed feed
+        request.close()
\ No newline at end of file
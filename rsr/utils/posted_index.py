@@ -0,0 +1,141 @@
+"""
+In-memory index of identifiers that were already posted
+
+Loading the identifiers of a collection once per run turns every
+"already posted?" check into an in-memory lookup instead of a database
+round trip.
+"""
+import math
+import hashlib
+
+# Defaults used when the posted_index_* settings are not configured
+DEFAULT_BLOOM_THRESHOLD = 100000
+DEFAULT_ERROR_RATE = 0.001
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set
+    
+    Membership tests can return false positives (at roughly error_rate)
+    but never false negatives, and memory stays bounded by the capacity.
+    """
+    
+    def __init__(self, capacity, error_rate=DEFAULT_ERROR_RATE):
+        """
+        Initialize an empty filter
+        
+        Args:
+            capacity (int): Expected number of items
+            error_rate (float): Target false positive rate at capacity
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        
+    def _positions(self, item):
+        # Double hashing: derive all positions from one 128-bit digest
+        digest = hashlib.blake2b(repr(item).encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+        
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+            
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class PostedIndex:
+    """
+    Identifiers stored in one field of a comic collection
+    
+    Small collections are held in an exact set. Collections larger than the
+    bloom threshold use a BloomFilter; a positive answer from the filter is
+    confirmed with a find_one so that a false positive never hides a new
+    comic.
+    """
+    
+    def __init__(self, collection, id_field, bloom_threshold=DEFAULT_BLOOM_THRESHOLD,
+                 error_rate=DEFAULT_ERROR_RATE):
+        """
+        Load the identifiers of a collection
+        
+        Args:
+            collection: pymongo collection to index
+            id_field (str): Field holding the identifier
+            bloom_threshold (int): Document count from which a bloom filter is used
+            error_rate (float): False positive rate of the bloom filter
+        """
+        self.collection = collection
+        self.id_field = id_field
+        self._ids = set()
+        self._bloom = None
+        
+        count = collection.estimated_document_count()
+        if bloom_threshold and count >= bloom_threshold:
+            # Leave room for growth so the error rate holds for a while
+            self._bloom = BloomFilter(count * 2, error_rate)
+            
+        cursor = collection.find({id_field: {'$exists': True}}, {id_field: 1, '_id': 0})
+        for doc in cursor:
+            self._store(doc[id_field])
+            
+    @property
+    def is_bloom(self):
+        return self._bloom is not None
+        
+    def _store(self, identifier):
+        if self._bloom is not None:
+            self._bloom.add(identifier)
+        else:
+            self._ids.add(identifier)
+            
+    def add(self, identifier):
+        """
+        Record an identifier that was posted during this run
+        
+        Args:
+            identifier: The identifier that was added to the collection
+        """
+        self._store(identifier)
+        if self._bloom is not None:
+            # Kept exactly so that confirmation does not depend on the DB write
+            self._ids.add(identifier)
+            
+    def missing(self, identifiers):
+        """
+        Get the identifiers that are not in the collection
+        
+        Bloom filter positives are confirmed with a single $in query
+        instead of one find_one per identifier.
+        
+        Args:
+            identifiers (list): Identifiers to check
+        
+        Returns:
+            set: The identifiers that were never posted
+        """
+        missing = set()
+        unsure = []
+        for identifier in identifiers:
+            if identifier in self._ids:
+                continue
+            if self._bloom is None or identifier not in self._bloom:
+                missing.add(identifier)
+            else:
+                unsure.append(identifier)
+        
+        if unsure:
+            cursor = self.collection.find({self.id_field: {'$in': unsure}}, {self.id_field: 1, '_id': 0})
+            found = {doc[self.id_field] for doc in cursor}
+            missing.update(identifier for identifier in unsure if identifier not in found)
+        return missing
+    
+    def __contains__(self, identifier):
+        if identifier in self._ids:
+            return True
+        if self._bloom is None or identifier not in self._bloom:
+            return False
+        return self.collection.find_one({self.id_field: identifier}, {'_id': 1}) is not None
@@ -0,0 +1,93 @@
+"""
+Shared HTTP session with connection pooling
+
+All outgoing HTTP traffic (scrapers and Telegram) goes through a single
+requests.Session so that TCP and TLS connections are kept alive and reused
+between requests to the same host.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rsr.utils.settings import get_setting
+
+# Defaults used when the http_* settings are not configured
+DEFAULT_POOL_CONNECTIONS = 32
+DEFAULT_POOL_MAXSIZE = 8
+DEFAULT_HOST_POOL_SIZES = {'https://api.telegram.org': 16}
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+_session = None
+_session_lock = threading.Lock()
+
+class PooledSession(requests.Session):
+    """
+    requests.Session that applies a default timeout to every request
+    
+    The underlying urllib3 connection pools are thread-safe, so a single
+    instance is shared by all scraper threads.
+    """
+    
+    def __init__(self, timeout):
+        super().__init__()
+        self.default_timeout = timeout
+        
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+def _build_session():
+    """
+    Create a session with pooled adapters configured from the settings
+    
+    Returns:
+        PooledSession: The new session
+    """
+    timeout = (
+        get_setting('http_connect_timeout', DEFAULT_CONNECT_TIMEOUT),
+        get_setting('http_read_timeout', DEFAULT_READ_TIMEOUT)
+    )
+    session = PooledSession(timeout)
+    
+    # Default adapter: one pool per host, pool_maxsize connections per pool
+    adapter = HTTPAdapter(
+        pool_connections=get_setting('http_pool_connections', DEFAULT_POOL_CONNECTIONS),
+        pool_maxsize=get_setting('http_pool_maxsize', DEFAULT_POOL_MAXSIZE)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    
+    # Hosts that see a lot of traffic get their own, larger pool
+    host_pool_sizes = get_setting('http_host_pool_sizes', DEFAULT_HOST_POOL_SIZES)
+    for prefix, size in host_pool_sizes.items():
+        session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=size))
+        
+    return session
+
+def get_session():
+    """
+    Get the process-wide HTTP session, creating it on first use
+    
+    Returns:
+        PooledSession: The shared session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def reset_session():
+    """
+    Close the shared session so that the next call builds a fresh one
+    
+    Used after the configuration has been reloaded.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
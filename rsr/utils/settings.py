@@ -0,0 +1,21 @@
+"""
+Access to optional configuration settings
+
+Required settings (API keys, channels) are imported directly from rsr.config.
+Optional tuning settings are read through get_setting so that existing
+config.py files keep working when new settings are introduced.
+"""
+from rsr import config
+
+def get_setting(name, default=None):
+    """
+    Get an optional setting from the configuration
+    
+    Args:
+        name (str): Name of the setting in rsr/config.py
+        default: Value to use when the setting is not defined
+        
+    Returns:
+        The configured value or the default
+    """
+    return getattr(config, name, default)
@@ -0,0 +1,128 @@
+"""
+Small persistent key/value stores for bot state
+
+Used for data that is cheap to lose and does not belong in MongoDB, such as
+HTTP cache validators. Each store is a JSON file in the state directory.
+"""
+import os
+import json
+import threading
+import tempfile
+
+from rsr.utils.settings import get_setting
+
+# Default state directory: <project root>/state
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'state')
+
+def get_state_dir():
+    """
+    Get the directory used for persistent bot state, creating it if needed
+    
+    Returns:
+        str: Path of the state directory
+    """
+    state_dir = get_setting('state_dir', DEFAULT_STATE_DIR)
+    os.makedirs(state_dir, exist_ok=True)
+    return state_dir
+
+class JsonStore:
+    """
+    Thread-safe dictionary persisted to a JSON file
+    
+    The file is loaded on first access and rewritten atomically on every
+    change, so a crash never leaves a half-written store behind.
+    
+    With max_entries, the store keeps only the most recently set keys.
+    """
+    
+    def __init__(self, name, max_entries=None):
+        """
+        Initialize the store
+        
+        Args:
+            name (str): Store name, used as the file name in the state directory
+            max_entries (int, optional): Keys kept at most; the least
+                recently set ones are dropped first
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self._data = None
+        self._lock = threading.Lock()
+        
+    @property
+    def path(self):
+        return os.path.join(get_state_dir(), f"{self.name}.json")
+        
+    def _load(self):
+        if self._data is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+        
+    def _save(self):
+        path = self.path
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{self.name}_")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error saving {self.name} store: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+                
+    def get(self, key, default=None):
+        """
+        Get a value from the store
+        
+        Args:
+            key (str): Key to look up
+            default: Value returned when the key is missing
+            
+        Returns:
+            The stored value or the default
+        """
+        with self._lock:
+            return self._load().get(key, default)
+            
+    def set(self, key, value):
+        """
+        Store a JSON-serializable value and persist the store
+        
+        Args:
+            key (str): Key to store the value under
+            value: Value to store
+        """
+        with self._lock:
+            data = self._load()
+            # Re-inserting moves the key to the end: the dict (and the JSON
+            # file) is ordered from least to most recently set
+            data.pop(key, None)
+            data[key] = value
+            if self.max_entries:
+                for old_key in list(data)[:max(0, len(data) - self.max_entries)]:
+                    del data[old_key]
+            self._save()
+            
+    def reload(self):
+        """
+        Forget the loaded data, so the next access reads the file again
+        
+        Needed when the state directory changes (e.g. between benchmark runs).
+        """
+        with self._lock:
+            self._data = None
+    
+    def delete(self, key):
+        """
+        Remove a key from the store if present
+        
+        Args:
+            key (str): Key to remove
+        """
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._save()
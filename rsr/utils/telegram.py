@@ -1,10 +1,219 @@
 """
 Telegram API utilities
 """
+import io
 import os
 import json
+import time
+import random
+import threading
+from urllib.parse import urlparse, parse_qsl
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+
 from rsr.config import botapi
+from rsr.utils import imaging, metrics
+from rsr.utils.session import get_session
+from rsr.utils.settings import get_setting
+from rsr.utils.store import JsonStore
+
+# Defaults used when the telegram_* settings are not configured
+DEFAULT_GLOBAL_RATE = 25          # messages per second for the whole bot
+DEFAULT_CHANNEL_RATE = 20 / 60    # messages per second to one group/channel
+DEFAULT_PRIVATE_RATE = 1.0        # messages per second to one private chat
+DEFAULT_CHAT_BURST = 3
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_ALBUM_WORKERS = 8         # concurrent checks/downloads per album
+DEFAULT_IMAGE_MAX_BYTES = 50 * 1024 * 1024  # largest file the bot may upload
+DEFAULT_FILE_ID_CACHE_SIZE = 5000  # file_ids remembered across runs
+
+# Largest photo Telegram accepts as an upload; bigger images are sent as documents
+PHOTO_MAX_BYTES = 10 * 1024 * 1024
+
+# Telegram accepts 2 to 10 items per media group
+MEDIA_GROUP_SIZE = 10
+
+# Error descriptions (lowercased) meaning Telegram could not download a URL
+URL_FETCH_ERRORS = (
+    'failed to get http url content',
+    'wrong file identifier/http url specified',
+    'webpage_curl_failed',
+    'webpage_media_empty',
+    'wrong type of the web page content'
+)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+    """
+    
+    def __init__(self, rate, capacity):
+        """
+        Initialize a full bucket
+        
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class _ChatQueue:
+    """Rate limit and FIFO ticket counter for one chat"""
+    
+    def __init__(self, rate, burst):
+        self.bucket = TokenBucket(rate, burst)
+        self.condition = threading.Condition()
+        self.next_ticket = 0
+        self.serving = 0
+
+class Dispatcher:
+    """
+    Central outbound queue for Telegram Bot API calls
+    
+    Every call takes a token from a global bucket and from its chat's bucket.
+    Calls to the same chat are sent strictly in the order they were made,
+    including while one of them waits out a 429 retry_after, so posts and
+    their captions never arrive out of order.
+    """
+    
+    def __init__(self, global_rate, channel_rate, private_rate, burst, max_retries):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.channel_rate = channel_rate
+        self.private_rate = private_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self._chats = {}
+        self._lock = threading.Lock()
+    
+    def _chat_queue(self, chat_id):
+        key = str(chat_id)
+        with self._lock:
+            queue = self._chats.get(key)
+            if queue is None:
+                # Channel usernames and group ids (negative) get the stricter group limit
+                is_group = key.startswith('@') or key.startswith('-')
+                queue = _ChatQueue(self.channel_rate if is_group else self.private_rate, self.burst)
+                self._chats[key] = queue
+            return queue
+    
+    def call(self, method, chat_id, data=None, files=None, token=None):
+        """
+        Call a Bot API method, waiting for the chat's turn and rate limits
+        
+        Args:
+            method (str): Bot API method name (e.g. 'sendPhoto')
+            chat_id (str): Target chat, used for ordering and rate limiting
+            data (dict, optional): Form fields
+            files (dict, optional): Multipart files (bytes, so they can be resent)
+            token (str, optional): Bot API key (defaults to the configured one)
+        
+        Returns:
+            Response from Telegram API
+        """
+        queue = self._chat_queue(chat_id)
+        with metrics.stage('telegram_wait'), queue.condition:
+            ticket = queue.next_ticket
+            queue.next_ticket += 1
+            while queue.serving != ticket:
+                queue.condition.wait()
+        try:
+            return self._send(queue, method, data, files, token or botapi)
+        finally:
+            with queue.condition:
+                queue.serving += 1
+                queue.condition.notify_all()
+    
+    def _send(self, queue, method, data, files, token):
+        url = f"https://api.telegram.org/bot{token}/{method}"
+        for attempt in range(self.max_retries + 1):
+            with metrics.stage('telegram_wait', count=0):
+                queue.bucket.acquire()
+                self.global_bucket.acquire()
+            try:
+                with metrics.stage('telegram'):
+                    response = get_session().post(url, data=data, files=files)
+            except requests.RequestException:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(2 ** attempt + random.uniform(0, 1))
+                continue
+            
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            if attempt == self.max_retries:
+                break
+            
+            # Flood control: wait as long as Telegram asks, plus jitter
+            delay = 2 ** attempt
+            try:
+                delay = response.json().get('parameters', {}).get('retry_after', delay)
+            except ValueError:
+                pass
+            print(f"Telegram {method} got {response.status_code}, retrying in {delay}s")
+            time.sleep(delay + random.uniform(0, 1))
+        
+        print(f"Telegram {method} failed after {self.max_retries + 1} attempts (status {response.status_code})")
+        return response
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher():
+    """
+    Get the process-wide Telegram dispatcher, creating it on first use
+    
+    Returns:
+        Dispatcher: The shared dispatcher
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = Dispatcher(
+                    get_setting('telegram_global_rate', DEFAULT_GLOBAL_RATE),
+                    get_setting('telegram_channel_rate', DEFAULT_CHANNEL_RATE),
+                    get_setting('telegram_private_rate', DEFAULT_PRIVATE_RATE),
+                    get_setting('telegram_chat_burst', DEFAULT_CHAT_BURST),
+                    get_setting('telegram_max_retries', DEFAULT_MAX_RETRIES)
+                )
+    return _dispatcher
+
+def call_api(method, chat_id, data=None, files=None, token=None):
+    """
+    Call a Telegram Bot API method through the rate-limited dispatcher
+    
+    Args:
+        method (str): Bot API method name (e.g. 'sendMessage')
+        chat_id (str): Target chat
+        data (dict, optional): Form fields (chat_id is added automatically)
+        files (dict, optional): Multipart files
+        token (str, optional): Bot API key (defaults to the configured one)
+    
+    Returns:
+        Response from Telegram API
+    """
+    data = dict(data or {})
+    data.setdefault('chat_id', chat_id)
+    return get_dispatcher().call(method, chat_id, data=data, files=files, token=token)
+
 
 def send_message(botapi, chat, message, params=""):
     """
@@ -19,67 +228,217 @@ def send_message(botapi, chat, message, params=""):
     Returns:
         Response from Telegram API
     """
+    data = {'chat_id': chat, 'text': message}
     if params:
-        return requests.get(f"https://api.telegram.org/bot{botapi}/sendMessage?chat_id={chat}&text={message}&{params}")
-    else:
-        return requests.get(f"https://api.telegram.org/bot{botapi}/sendMessage?chat_id={chat}&text={message}")
+        data.update(parse_qsl(params))
+    return call_api('sendMessage', chat, data, token=botapi)
+
+# Headers used when downloading images ourselves (avoids hotlink blocking)
+IMAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Referer': 'https://www.extrafabulouscomics.com/'
+}
+
+# Telegram file_id of the images sent so far, keyed by source URL, kept in
+# the state directory so a later run (or another channel) can send the same
+# image again without any upload. Created on first use, so the size setting
+# is read after the configuration is loaded
+_file_ids = None
+_file_ids_lock = threading.Lock()
+
+def _get_file_ids():
+    global _file_ids
+    with _file_ids_lock:
+        if _file_ids is None:
+            _file_ids = JsonStore('telegram_file_ids', get_setting('file_id_cache_size', DEFAULT_FILE_ID_CACHE_SIZE))
+        return _file_ids
 
-def sendPhoto(chatid, url, caption=""):
+def _remember_file_id(url, response):
+    """
+    Record the file_id of a sent photo
+    
+    Args:
+        url (str): Source URL of the image
+        response: Successful sendPhoto response
+    """
+    try:
+        sizes = response.json()['result']['photo']
+        # The last size is the largest one
+        _get_file_ids().set(url, sizes[-1]['file_id'])
+    except (ValueError, KeyError, IndexError, TypeError):
+        pass
+
+def get_file_id(url):
+    """
+    Get the Telegram file_id recorded for an image URL
+    
+    Args:
+        url (str): Source URL of the image
+    
+    Returns:
+        str or None: The file_id if the image was sent before
+    """
+    return _get_file_ids().get(url)
+
+def _post_photo(chatid, photo, caption="", files=None, method='sendPhoto', field='photo'):
+    """
+    Call sendPhoto (or sendDocument) with either a reference or an uploaded file
+    
+    Args:
+        chatid (str): Chat ID to send the photo to
+        photo (str): file_id or URL for Telegram to fetch (ignored with files)
+        caption (str): Caption for the image
+        files (dict, optional): Multipart upload for the photo
+        method (str): API method, 'sendDocument' to send the file as is
+        field (str): Name of the media field for that method
+    
+    Returns:
+        Response from Telegram API
+    """
+    data = {'chat_id': chatid}
+    long_caption = bool(caption) and len(caption) > 200
+    if caption and not long_caption:
+        data['caption'] = caption
+        data['parse_mode'] = 'Markdown'
+    if not files:
+        data[field] = photo
+    
+    response = call_api(method, chatid, data, files=files)
+    
+    if response.ok and long_caption:
+        # Send the caption as a separate message
+        send_message(botapi, chatid, caption)
+    return response
+
+def _telegram_fetch_failed(response):
+    """
+    Check whether Telegram rejected a photo because it could not fetch the URL
+    
+    Other errors (chat not found, bot blocked, rate limits, server errors,
+    bad captions) would fail the same way for an upload.
+    
+    Args:
+        response: Failed sendPhoto response
+    
+    Returns:
+        bool: True when uploading the image ourselves may succeed
+    """
+    try:
+        description = response.json().get('description', '')
+    except ValueError:
+        return False
+    description = (description or '').lower()
+    return any(error in description for error in URL_FETCH_ERRORS)
+
+def _normalized_payload(payload, panel):
+    """Replace the bytes of a downloaded image with a normalized JPEG"""
+    filename = os.path.splitext(payload[0])[0] + '.jpg'
+    return filename, panel
+
+def _upload_panels(chatid, payload, panels, caption=""):
+    """
+    Upload the panels of a sliced image as albums
+    
+    Args:
+        chatid (str): Chat ID to send the panels to
+        payload (tuple): The (filename, bytes) of the source image
+        panels (list): JPEG panels, top to bottom
+        caption (str): Caption for the first panel
+    
+    Returns:
+        Response from Telegram API for the last album sent
+    """
+    response = None
+    base = os.path.splitext(payload[0])[0]
+    uploads = [(f"{base}_{number}.jpg", panel) for number, panel in enumerate(panels, 1)]
+    for number, group in enumerate(_album_groups(uploads), 1):
+        group_caption = caption if number == 1 else None
+        if len(group) == 1:
+            response = _post_photo(chatid, None, group_caption or "", files={'photo': group[0]})
+        else:
+            media, files = [], {}
+            for i, upload in enumerate(group):
+                files[f"file{i}"] = upload
+                entry = {'type': 'photo', 'media': f"attach://file{i}"}
+                if i == 0 and group_caption:
+                    entry['caption'] = group_caption
+                    entry['parse_mode'] = 'Markdown'
+                media.append(entry)
+            response = call_api('sendMediaGroup', chatid, {'media': json.dumps(media)}, files=files)
+        if not response.ok:
+            break
+    return response
+
+def sendPhoto(chatid, url, caption="", normalize=False):
     """
     Send a photo to a Telegram chat
     
+    Tries, in order: the file_id of a previous send of the same image, the
+    URL (Telegram downloads the image itself) and finally an in-memory
+    upload for hosts that block hotlinking.
+    
+    Uploaded images are normalized (see rsr.utils.imaging) when they are
+    too large for a photo, or always with normalize: WebP is re-encoded as
+    JPEG, wide images are downscaled and tall strips are posted as an album
+    of panels.
+    
     Args:
         chatid (str): Chat ID to send the photo to
         url (str): URL of the image
         caption (str): Caption for the image
+        normalize (bool): Always upload the image through normalization
+            instead of letting Telegram fetch the URL (ignored without
+            Pillow, as the upload would be unchanged)
         
     Returns:
         Response from Telegram API or None on failure
     """
     print(f"Posting {url} to {chatid}")
+    normalize = normalize and imaging.available()
     try:
-        # Add headers to avoid being blocked
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://www.extrafabulouscomics.com/'
-        }
+        file_id = get_file_id(url)
+        if file_id:
+            response = _post_photo(chatid, file_id, caption)
+            if response.ok:
+                # Mark as recently used
+                _get_file_ids().set(url, file_id)
+                return response
         
-        # Download the image
-        img_response = requests.get(url, headers=headers)
+        if not normalize:
+            # Let Telegram fetch the image from the URL
+            response = _post_photo(chatid, url, caption)
+            if response.ok:
+                _remember_file_id(url, response)
+                return response
+            if not _telegram_fetch_failed(response):
+                return response
         
-        if img_response.status_code == 200:
-            # Save file temporarily
-            with open('temp_comic.jpg', 'wb') as f:
-                f.write(img_response.content)
-            
-            # Send the photo using multipart/form-data
-            files = {'photo': open('temp_comic.jpg', 'rb')}
-            params = {'chat_id': chatid}
-            
-            if caption:
-                if len(caption) > 200:
-                    # Send photo first
-                    response = requests.post(f"https://api.telegram.org/bot{botapi}/sendPhoto", files=files, data={'chat_id': chatid})
-                    # Then send caption as separate message
-                    send_message(botapi, chatid, caption)
-                else:
-                    params['caption'] = caption
-                    params['parse_mode'] = 'Markdown'
-                    response = requests.post(f"https://api.telegram.org/bot{botapi}/sendPhoto", files=files, data=params)
-            else:
-                response = requests.post(f"https://api.telegram.org/bot{botapi}/sendPhoto", files=files, data=params)
-            
-            # Clean up
-            try:
-                files['photo'].close()
-                if os.path.exists('temp_comic.jpg'):
-                    os.remove('temp_comic.jpg')
-            except Exception as cleanup_error:
-                print(f"Error cleaning up temp file: {str(cleanup_error)}")
-                
+            print(f"Telegram could not fetch {url} (status {response.status_code}), uploading it")
+        
+        # Download the image into memory and upload it
+        status, payload, kind = _download(url)
+        
+        if payload is not None and kind == 'photo' and (normalize or len(payload[1]) > PHOTO_MAX_BYTES):
+            panels = imaging.normalize(payload[1])
+            if panels and len(panels) > 1:
+                print(f"Sending {url} as {len(panels)} panels")
+                return _upload_panels(chatid, payload, panels, caption)
+            if panels:
+                payload = _normalized_payload(payload, panels[0])
+        
+        if payload is not None and kind == 'photo' and len(payload[1]) <= PHOTO_MAX_BYTES:
+            files = {'photo': payload}
+            response = _post_photo(chatid, None, caption, files=files)
+            if response.ok:
+                _remember_file_id(url, response)
             return response
+        elif payload is not None:
+            # Animated GIFs, videos and very large images are sent as files
+            print(f"Sending {url} as a document ({kind}, {len(payload[1])} bytes)")
+            files = {'document': payload}
+            return _post_photo(chatid, None, caption, files=files, method='sendDocument', field='document')
         else:
-            error_msg = f"Failed to download image (status {img_response.status_code}): {url}"
+            error_msg = f"Failed to download image (status {status}): {url}"
             print(error_msg)
             from rsr.config import adminchat
             send_message(botapi, adminchat, error_msg)
@@ -91,61 +450,289 @@ def sendPhoto(chatid, url, caption=""):
         send_message(botapi, adminchat, error_msg)
         return None
 
+def _sniff(head):
+    """
+    Identify a media file from its first bytes
+    
+    Args:
+        head (bytes): Start of the file (at least 12 bytes)
+    
+    Returns:
+        str or None: 'photo' (JPEG, PNG, WebP), 'animation' (GIF), 'video'
+            (MP4, WebM) or None for anything else
+    """
+    if head.startswith(b'\xff\xd8\xff') or head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'photo'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'photo'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'animation'
+    if head[4:8] == b'ftyp' or head.startswith(b'\x1a\x45\xdf\xa3'):
+        return 'video'
+    return None
+
+def _download(url):
+    """
+    Download an image into memory
+    
+    The download is streamed and given up early when the first bytes are
+    not a known media format (e.g. an HTML error page) or when the file
+    grows beyond the image_max_bytes setting.
+    
+    Args:
+        url (str): URL of the image
+    
+    Returns:
+        tuple: HTTP status code, the (filename, bytes) to upload or None
+            when the download failed, and the media kind (see _sniff)
+    """
+    max_bytes = get_setting('image_max_bytes', DEFAULT_IMAGE_MAX_BYTES)
+    with metrics.stage('image_download'):
+        response = get_session().get(url, headers=IMAGE_HEADERS, stream=True)
+        try:
+            if response.status_code != 200:
+                return response.status_code, None, None
+            
+            length = response.headers.get('Content-Length', '')
+            if length.isdigit() and int(length) > max_bytes:
+                print(f"Not downloading {url}: {length} bytes is over the limit of {max_bytes}")
+                return response.status_code, None, None
+            
+            buffer = io.BytesIO()
+            kind = None
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                buffer.write(chunk)
+                if kind is None and buffer.tell() >= 16:
+                    kind = _sniff(buffer.getvalue()[:16])
+                    if kind is None:
+                        print(f"Not downloading {url}: not an image or video")
+                        return response.status_code, None, None
+                if buffer.tell() > max_bytes:
+                    print(f"Stopped downloading {url}: over the limit of {max_bytes} bytes")
+                    return response.status_code, None, None
+        finally:
+            response.close()
+    metrics.add_bytes('image_download', buffer.tell())
+    
+    if kind is None:
+        kind = _sniff(buffer.getvalue())
+        if kind is None:
+            return response.status_code, None, None
+    
+    filename = os.path.basename(urlparse(url).path) or 'comic.jpg'
+    return response.status_code, (filename, buffer.getvalue()), kind
+
+def _map_concurrently(func, items):
+    """
+    Call a function for every item on a small thread pool
+    
+    Args:
+        func (callable): Function taking one item
+        items (list): Items to process
+    
+    Returns:
+        list: Results in the order of the items
+    """
+    # Helper threads report their timings to the caller's run report
+    report = metrics.current_report()
+    
+    def task(item):
+        with metrics.bind(report):
+            return func(item)
+    
+    workers = max(1, min(get_setting('album_workers', DEFAULT_ALBUM_WORKERS), len(items)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="album") as executor:
+        return list(executor.map(task, items))
+
+def _media_type(url):
+    """Get the sendMediaGroup type of a media URL"""
+    return 'video' if "mp4" in url or "gif" in url else 'photo'
+
+def _media_available(url):
+    """
+    Check with a HEAD request that a media URL still exists
+    
+    Only a definite 404/410 counts as missing: hosts that refuse HEAD or
+    cannot be reached are left to Telegram and the upload fallback.
+    
+    Args:
+        url (str): URL of the photo or video
+    
+    Returns:
+        bool: False if the media is gone
+    """
+    try:
+        with metrics.stage('http'):
+            response = get_session().head(url, headers=IMAGE_HEADERS, allow_redirects=True)
+    except requests.RequestException:
+        return True
+    return response.status_code not in (404, 410)
+
+def _album_groups(items):
+    """
+    Split media items into albums, keeping their order
+    
+    Albums hold 2 to 10 items, so a lone trailing item borrows one from the
+    previous album (11 items are sent as 9 + 2).
+    
+    Args:
+        items (list): Media items
+    
+    Returns:
+        list: Lists of media items
+    """
+    groups = [items[i:i + MEDIA_GROUP_SIZE] for i in range(0, len(items), MEDIA_GROUP_SIZE)]
+    if len(groups) > 1 and len(groups[-1]) == 1:
+        groups[-1].insert(0, groups[-2].pop())
+    return groups
+
+def _remember_album_file_ids(group, response):
+    """
+    Record the file_ids of the photos of a sent album
+    
+    Args:
+        group (list): Media items that were sent
+        response: Successful sendMediaGroup response
+    """
+    try:
+        messages = response.json()['result']
+    except (ValueError, KeyError, TypeError):
+        return
+    for item, message in zip(group, messages):
+        try:
+            _get_file_ids().set(item['url'], message['photo'][-1]['file_id'])
+        except (KeyError, IndexError, TypeError):
+            pass
+
+def _send_media_group(chat_id, group, caption=None):
+    """
+    Send one album, uploading the media if Telegram cannot fetch the URLs
+    
+    Args:
+        chat_id (str): Chat ID to send the album to
+        group (list): 2 to 10 media items ('type' and 'url')
+        caption (str, optional): Caption for the first item
+    
+    Returns:
+        Response from Telegram API or None if too few items could be downloaded
+    """
+    def media_json(items, refs):
+        media = []
+        for i, (item, ref) in enumerate(zip(items, refs)):
+            entry = {'type': item['type'], 'media': ref}
+            # Add caption to first item if provided
+            if i == 0 and caption:
+                entry['caption'] = caption
+                entry['parse_mode'] = 'Markdown'
+            media.append(entry)
+        return json.dumps(media)
+    
+    refs = [get_file_id(item['url']) or item['url'] for item in group]
+    response = call_api('sendMediaGroup', chat_id, {'media': media_json(group, refs)})
+    if response.ok:
+        _remember_album_file_ids(group, response)
+        return response
+    if not _telegram_fetch_failed(response):
+        return response
+    
+    print(f"Telegram could not fetch the album (status {response.status_code}), uploading it")
+    
+    # Download every item at once and upload them in the same request
+    downloads = _map_concurrently(_download, [item['url'] for item in group])
+    items, refs, files = [], [], {}
+    for item, (status, payload, kind) in zip(group, downloads):
+        if payload is None:
+            print(f"Failed to download album item (status {status}): {item['url']}")
+            continue
+        if item['type'] == 'photo' and kind == 'photo' and len(payload[1]) > PHOTO_MAX_BYTES:
+            # Shrink oversized photos; an album item cannot be sliced
+            panels = imaging.normalize(payload[1], allow_slices=False)
+            if panels == []:
+                print(f"Album item is too tall for a photo: {item['url']}")
+                continue
+            if panels:
+                payload = _normalized_payload(payload, panels[0])
+        if item['type'] == 'photo' and (kind != 'photo' or len(payload[1]) > PHOTO_MAX_BYTES):
+            # Albums cannot mix documents with photos
+            print(f"Album item is not an uploadable photo ({kind}, {len(payload[1])} bytes): {item['url']}")
+            continue
+        name = f"file{len(files)}"
+        files[name] = payload
+        items.append(item)
+        refs.append(f"attach://{name}")
+    
+    if len(items) == 1:
+        return _send_single(chat_id, items[0], caption)
+    if not items:
+        return None
+    response = call_api('sendMediaGroup', chat_id, {'media': media_json(items, refs)}, files=files)
+    if response.ok:
+        _remember_album_file_ids(items, response)
+    return response
+
+def _send_single(chat_id, item, caption=None):
+    """
+    Send a single media item outside of an album
+    
+    Args:
+        chat_id (str): Chat ID to send the item to
+        item (dict): Media item ('type' and 'url')
+        caption (str, optional): Caption for the item
+    
+    Returns:
+        Response from Telegram API or None on failure
+    """
+    if item['type'] == 'photo':
+        return sendPhoto(chat_id, item['url'], caption or "")
+    data = {'video': item['url']}
+    if caption:
+        data['caption'] = caption
+        data['parse_mode'] = 'Markdown'
+    return call_api('sendVideo', chat_id, data)
+
 def sendAlbums(channel, array, caption=None):
     """
     Send a media group (album) to a Telegram chat
     
+    All items are checked concurrently first so that broken links are
+    dropped before anything is posted. The rest is split, in order, into
+    albums of up to 10 photos and videos which are sent back to back
+    through the rate-limited dispatcher; the caption goes on the first item.
+    
     Args:
         channel (str): Chat ID to send the album to
         array (list): List of media URLs
         caption (str, optional): Caption for the album
         
     Returns:
-        Response from Telegram API
+        Response from Telegram API for the last album sent, or None on failure
     """
-    url = f"https://api.telegram.org/bot{botapi}/sendMediagroup"
-    chat_id = channel
-    photo_urls = []
-    video_urls = []
+    from rsr.config import adminchat
     
-    for i, media_url in enumerate(array):
-        if "mp4" in media_url or "gif" in media_url:
-            media_item = {'type': "video", "media": media_url}
-            # Add caption to first item if provided
-            if i == 0 and caption:
-                media_item['caption'] = caption
-                media_item['parse_mode'] = 'Markdown'
-            video_urls.append(media_item)
+    items = [{'type': _media_type(url), 'url': url} for url in array]
+    available = _map_concurrently(_media_available, [item['url'] for item in items]) if items else []
+    missing = [item['url'] for item, ok in zip(items, available) if not ok]
+    items = [item for item, ok in zip(items, available) if ok]
+    if missing:
+        print(f"Skipping {len(missing)} missing album item(s): {', '.join(missing)}")
+    if not items:
+        send_message(botapi, adminchat, f"No media left to send in album for {channel}")
+        return None
+    
+    response = None
+    groups = _album_groups(items)
+    for number, group in enumerate(groups, 1):
+        group_caption = caption if number == 1 else None
+        if len(group) == 1:
+            response = _send_single(channel, group[0], group_caption)
         else:
-            media_item = {'type': "photo", "media": media_url}
-            # Add caption to first item if provided
-            if i == 0 and caption:
-                media_item['caption'] = caption
-                media_item['parse_mode'] = 'Markdown'
-            photo_urls.append(media_item)
-    
-    if len(array) > 10:
-        number = len(array)
-        start = 0
-        stop = 10
-        while number > 0:
-            request = requests.get(url, 
-                        {
-                            "chat_id": chat_id,
-                            "media": json.dumps(photo_urls[start:stop])
-                        }
-                    )
-            start = stop
-            stop += 10
-            number -= 10
-    else:
-        print("\n\n--------------------------------")
-        print(array)
-        print("\n\n--------------------------------")
-        request = requests.get(url, 
-                        {
-                            "chat_id": chat_id,
-                            "media": json.dumps(photo_urls)
-                        }
-                    )
-    return request 
\ No newline at end of file
+            response = _send_media_group(channel, group, group_caption)
+    
+        if response is None or not response.ok:
+            # Stop here, later parts would be posted out of context
+            status = response.status_code if response is not None else "no response"
+            error_msg = f"Failed to send album part {number}/{len(groups)} to {channel} (status {status})"
+            print(error_msg)
+            send_message(botapi, adminchat, error_msg)
+            return response
+    return response
\ No newline at end of file
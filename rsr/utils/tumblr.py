@@ -0,0 +1,71 @@
+"""
+Tumblr image utilities
+
+Tumblr serves every image in several sizes, chosen by a suffix of the file
+name (..._1280.png, ..._500.png, ...). Themes usually embed a small one, so
+scrapers of Tumblr-hosted comics look for the largest size that exists.
+"""
+import re
+from collections import OrderedDict
+
+from rsr.utils.http import probe_urls
+from rsr.utils.store import JsonStore
+
+# Size suffixes Tumblr serves, largest first
+SIZE_SUFFIXES = ["_1280", "_640", "_540", "_500", "_400", "_250"]
+
+# Resolved URLs kept across runs (enough for a few pages of posts)
+CACHE_SIZE = 256
+
+_SIZE_PATTERN = re.compile(r'_\d+(\.\w+)$')
+_EXTENSION_PATTERN = re.compile(r'(\.\w+)$')
+
+_resolved = JsonStore('tumblr_resolved', CACHE_SIZE)
+
+def size_variants(src):
+    """
+    List the size variants of a Tumblr image URL, largest first
+    
+    Args:
+        src (str): Image URL as found on the page
+    
+    Returns:
+        list: Candidate URLs: the unsuffixed original, every size suffix,
+            and finally src itself (only src for non-Tumblr URLs)
+    """
+    base = src.split('?')[0]
+    candidates = []
+    if _SIZE_PATTERN.search(base) or 'media.tumblr.com' in base:
+        unsized = _SIZE_PATTERN.sub(r'\1', base)
+        candidates.append(unsized)
+        candidates.extend(_EXTENSION_PATTERN.sub(f'{size}\\1', unsized) for size in SIZE_SUFFIXES)
+    candidates.append(src)
+    
+    # Drop duplicates, keeping the first (largest) position
+    return list(OrderedDict.fromkeys(candidates))
+
+def resolve_image(src, post_id=None):
+    """
+    Find the largest size variant of a Tumblr image that exists
+    
+    All variants are checked at once with HEAD requests. Results are kept
+    per post and image in the state directory, so a post that is seen again
+    (e.g. in the next run, because posting it failed) costs no requests.
+    
+    Args:
+        src (str): Image URL as found on the page
+        post_id (str, optional): Tumblr post ID, used for the cache
+    
+    Returns:
+        str or None: URL of the largest existing variant, or None if none
+            of them (not even src) could be fetched
+    """
+    key = f"{post_id} {src}"
+    url = _resolved.get(key)
+    if url is not None:
+        return url
+    
+    url = probe_urls(size_variants(src))
+    if url is not None:
+        _resolved.set(key, url)
+    return url
@@ -0,0 +1,90 @@
+"""
+Write-behind buffer for posted comic records
+
+Records of posted comics are collected in memory and written with one
+unordered insert_many per batch instead of one insert_one per comic, so
+posting several comics in a run does not wait on the database between
+Telegram sends.
+"""
+import time
+
+from pymongo.errors import BulkWriteError
+
+# Defaults used when the posted_buffer_* settings are not configured
+DEFAULT_BUFFER_SIZE = 50
+DEFAULT_BUFFER_DELAY = 30
+
+# MongoDB error code for a duplicate key
+DUPLICATE_KEY_ERROR = 11000
+
+class WriteBuffer:
+    """
+    Documents waiting to be inserted into one collection
+
+    The buffer is flushed once it holds max_size documents, when a document
+    is added more than max_delay seconds after the oldest one, and whenever
+    flush() is called (the scraper does so when its run ends).
+    """
+
+    def __init__(self, collection, max_size=DEFAULT_BUFFER_SIZE, max_delay=DEFAULT_BUFFER_DELAY):
+        """
+        Initialize an empty buffer
+
+        Args:
+            collection: The pymongo collection to write to
+            max_size (int): Documents held before a flush
+            max_delay (float): Seconds the oldest document may wait
+        """
+        self.collection = collection
+        self.max_size = max(1, max_size)
+        self.max_delay = max_delay
+        self.pending = []
+        self._oldest = None
+
+    def add(self, document):
+        """
+        Queue a document, flushing if a threshold is reached
+
+        Args:
+            document (dict): Document to insert
+
+        Returns:
+            list: Errors of the flush this triggered (see flush)
+        """
+        if not self.pending:
+            self._oldest = time.monotonic()
+        self.pending.append(document)
+
+        if len(self.pending) >= self.max_size or time.monotonic() - self._oldest >= self.max_delay:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """
+        Insert all queued documents
+
+        Documents that already exist (duplicate key) are skipped without
+        affecting the rest of the batch. The buffer is emptied even when
+        the insert fails, so a failed batch is reported once, not retried.
+
+        Returns:
+            list: Error messages of documents that could not be inserted
+        """
+        if not self.pending:
+            return []
+
+        documents = self.pending
+        self.pending = []
+        self._oldest = None
+
+        try:
+            self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            return [
+                f"{error.get('errmsg', 'write error')} (code {error.get('code')})"
+                for error in e.details.get('writeErrors', [])
+                if error.get('code') != DUPLICATE_KEY_ERROR
+            ]
+        except Exception as e:
+            return [f"{len(documents)} record(s) not stored: {str(e)}"]
+        return []
@@ -3,8 +3,34 @@
 Simple runner script for the RSS Slave Bot
 
 This is a convenience script to run the bot from the project root
+
+Usage:
+    python run.py               Check every comic once and exit (for cron)
+    python run.py xkcd pbf      Only check these comics
+    python run.py --daemon      Keep running and poll each comic on its own interval
+    python run.py --async       Check every comic once on an asyncio event loop
 """
-from rsr.main import main
+import argparse
+
+from rsr.main import main, select_scrapers
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Run the RSS Slave Bot')
+    parser.add_argument('scrapers', nargs='*', help='Scrapers to run, by class, module or collection name (default: all)')
+    parser.add_argument('--daemon', action='store_true', help='Run as a long-lived scheduler instead of a single pass')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Run the single pass on an asyncio event loop')
+    args = parser.parse_args()
+    
+    if args.daemon and args.use_async:
+        parser.error('--async cannot be combined with --daemon')
+    
+    try:
+        select_scrapers(args.scrapers)
+    except KeyError as e:
+        parser.error(e.args[0])
+    
+    if args.daemon:
+        from rsr.daemon import main as daemon_main
+        daemon_main(args.scrapers)
+    else:
+        main(args.scrapers, use_async=args.use_async)
\ No newline at end of file
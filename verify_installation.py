@@ -5,6 +5,7 @@ Verify that the RSSSlaveBot installation is correctly configured
 - Verifies database collections are populated
 - Tests import of scrapers
 - Validates configuration
+- Checks optional image support
 """
 import os
 import sys
@@ -64,8 +65,19 @@ def fix_duplicate_key_issues(client):
         db = client['comics_db']
         collections = db.list_collection_names()
         
+        # Identifier field of each scraper's collection
+        id_fields = {}
+        try:
+            if '.' not in sys.path:
+                sys.path.insert(0, '.')
+            from rsr.scrapers import registry
+            id_fields = {entry.collection: entry.id_field for entry in registry.values()}
+        except Exception as e:
+            print(f"   ⚠️ Could not load scrapers, using generic indexes: {str(e)}")
+        
         for coll_name in collections:
             collection = db[coll_name]
+            id_field = id_fields.get(coll_name)
             
             # Get all indexes
             indexes = collection.index_information()
@@ -76,7 +88,7 @@ def fix_duplicate_key_issues(client):
                 if idx_name != '_id_':  # Skip the default _id index
                     try:
                         key_fields = [field[0] for field in idx_info['key']]
-                        if 'url' in key_fields and idx_info.get('unique', False):
+                        if 'url' in key_fields and idx_info.get('unique', False) and id_field != 'url':
                             print(f"   - Dropping problematic unique index on 'url' field in {coll_name}")
                             collection.drop_index(idx_name)
                             print(f"   ✅ Index dropped successfully")
@@ -86,6 +98,13 @@ def fix_duplicate_key_issues(client):
             # Create a better compound index on multiple fields
             try:
                 print(f"   - Creating improved indexes for {coll_name}")
+                if id_field:
+                    # Same indexes as the bot creates at startup
+                    from rsr.utils.db import ensure_indexes
+                    for warning in ensure_indexes(collection, id_field):
+                        print(f"   ⚠️ {warning}")
+                    print(f"   ✅ Indexes on '{id_field}' and 'date' are in place")
+                    continue
                 # Create index on comic_id which is the most reliable identifier
                 collection.create_index('comic_id', unique=True, sparse=True)
                 # Create index on image_url which is also reliable
@@ -111,16 +130,20 @@ def check_scraper_imports():
         
         # Check active scrapers
         try:
-            from rsr.scrapers import active_scrapers
-            print(f"✅ Found {len(active_scrapers)} active scrapers:")
-            for scraper_class in active_scrapers:
+            from rsr.scrapers import registry
+            print(f"✅ Found {len(registry)} active scrapers:")
+            for entry in registry.values():
                 try:
-                    scraper_instance = scraper_class()
-                    # Get collection name from the posted attribute
+                    scraper_instance = entry.load()()
+                    # The registry must match what the scraper really uses
                     collection_name = scraper_instance.posted.name
-                    print(f"   - {scraper_instance.comic_name} ({collection_name})")
+                    if collection_name != entry.collection or scraper_instance.id_field != entry.id_field:
+                        print(f"   - {entry.name}: ⚠️ Registry says {entry.collection}/{entry.id_field}, "
+                              f"scraper uses {collection_name}/{scraper_instance.id_field}")
+                    else:
+                        print(f"   - {scraper_instance.comic_name} ({collection_name})")
                 except Exception as e:
-                    print(f"   - {scraper_class.__name__}: ❌ Error initializing: {str(e)}")
+                    print(f"   - {entry.name}: ❌ Error initializing: {str(e)}")
         except Exception as e:
             print(f"❌ Error checking active scrapers: {str(e)}")
             
@@ -166,6 +189,18 @@ def check_run_script():
     else:
         print(f"❌ Run script not found at {run_path}")
 
+def check_image_support():
+    """Check if Pillow is installed for image normalization and fingerprints"""
+    print("\n7. Checking image support...")
+    try:
+        import PIL
+        print(f"✅ Pillow {PIL.__version__} is installed")
+    except ImportError:
+        print("⚠️ Pillow is not installed. Images are posted as they are, and")
+        print("   re-encoded or resized copies of posted images are not detected")
+        print("   as duplicates (only exact copies are). Install it with:")
+        print("   pip install Pillow")
+
 def main():
     """Main verification function"""
     print("=== RSS Slave Bot Installation Verification ===")
@@ -180,6 +215,7 @@ def main():
     check_scraper_imports()
     check_config()
     check_run_script()
+    check_image_support()
     
     print("\n=== Verification Complete ===")
 